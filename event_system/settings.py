@@ -24,6 +24,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'events.middleware.QueryTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', 
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -78,6 +79,60 @@ else:
         }
     }
 
+# Cache (local memory by default; point "default" at Redis/Memcached in production)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'event-system',
+    }
+}
+
+# Seconds the dashboard counters stay cached; signals invalidate them earlier on change
+EVENTS_STATS_CACHE_TIMEOUT = 300
+
+# Seconds anonymous event/category listings and event card fragments stay cached;
+# event, category and RSVP changes invalidate them earlier
+EVENTS_CATALOG_CACHE_TIMEOUT = 300
+
+# Event list pagination: 'offset' (numbered pages) or 'keyset' (cursors, no COUNT/OFFSET)
+EVENTS_LIST_PAGINATION = 'offset'
+
+# Full-text search: None picks SQLite FTS5 / PostgreSQL tsvector from the database vendor,
+# or set a dotted path such as 'events.search.BasicSearchBackend'
+EVENTS_SEARCH_BACKEND = None
+# PostgreSQL text search configuration; run manage.py rebuild_search_index after changing it
+EVENTS_SEARCH_CONFIG = 'english'
+
+# Per-request SQL/timing instrumentation (events.middleware.QueryTimingMiddleware)
+# Fraction of requests measured, 0 disables; off by default outside DEBUG because
+# every measured request logs a JSON line with its slowest SQL
+EVENTS_TIMING_SAMPLE_RATE = config('EVENTS_TIMING_SAMPLE_RATE', default=1.0 if DEBUG else 0.0, cast=float)
+EVENTS_SLOW_REQUEST_MS = 500  # measured requests slower than this log at WARNING
+
+# Most operations accepted by one request to the JSON RSVP endpoint
+EVENTS_RSVP_BATCH_LIMIT = 100
+
+# Uploaded images larger than this on either side are rejected; resized WebP/JPEG
+# variants are written under MEDIA_ROOT/thumbnails/ (see events.images)
+EVENTS_IMAGE_MAX_DIMENSION = 8000
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'events.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'Asia/Dhaka'
@@ -89,6 +144,14 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic rebuilds the Tailwind CSS (needs "npm install"), hashes file names and
+# writes gzip/brotli copies; WhiteNoise serves hashed files with immutable cache headers
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'events.storage.StaticFilesStorage'},
+}
+EVENTS_TAILWIND_BUILD = config('EVENTS_TAILWIND_BUILD', default=True, cast=bool)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Media files settings
@@ -104,7 +167,7 @@ LOGOUT_REDIRECT_URL = 'event_list'
 LOGIN_URL = 'login'
 
 # Email settings (REAL EMAIL SENDING)
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 
 EMAIL_HOST = config('EMAIL_HOST')
 EMAIL_PORT = config('EMAIL_PORT', cast=int)
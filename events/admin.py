@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Event, Category, UserProfile
+from .models import Event, Category, UserProfile, OutboundEmail
 
 # Register your models here.
 admin.site.register(Event)
 admin.site.register(Category)
 admin.site.register(UserProfile)
+admin.site.register(OutboundEmail)
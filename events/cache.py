@@ -0,0 +1,51 @@
+"""Versioned cache namespaces on top of Django's cache framework.
+
+Each namespace owns a version number stored in the cache. Keys built with
+``versioned_key`` embed the current version, so bumping it invalidates every
+entry of the namespace at once without having to know which keys exist. The
+backend is whatever ``EVENTS_CACHE_ALIAS`` (default: ``"default"``) points to.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+STATS = 'stats'
+
+
+def get_cache():
+    return caches[getattr(settings, 'EVENTS_CACHE_ALIAS', 'default')]
+
+
+def _version_key(namespace):
+    return f'events:{namespace}:version'
+
+
+def get_version(namespace):
+    cache = get_cache()
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        # Seed with a timestamp so a version lost to eviction or a restart never
+        # comes back to a number whose entries may still be cached.
+        cache.add(_version_key(namespace), time.time_ns() // 1_000_000, timeout=None)
+        version = cache.get(_version_key(namespace))
+    return version
+
+
+def bump_version(namespace):
+    """Invalidate every entry cached under ``namespace``"""
+    cache = get_cache()
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        get_version(namespace)
+
+
+def versioned_key(namespace, *parts):
+    suffix = ':'.join(str(part) for part in parts)
+    return f'events:{namespace}:{get_version(namespace)}:{suffix}'
+
+
+def get_or_set(namespace, parts, default, timeout=None):
+    """Return the cached value for ``parts``, computing it with ``default()`` on a miss"""
+    return get_cache().get_or_set(versioned_key(namespace, *parts), default, timeout)
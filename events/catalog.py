@@ -0,0 +1,153 @@
+"""Caching of the public event catalog (event and category listings).
+
+Everything here lives in the ``catalog`` cache namespace, whose version is
+bumped by ``invalidate()`` whenever an event, category or RSVP changes (see
+``events.signals`` and ``events.rsvp``). That covers:
+
+* whole responses for anonymous visitors, keyed on the view and its
+  normalized filter parameters (``cache_anonymous_page``);
+* template fragments for authenticated visitors, keyed on
+  ``content_version()``, which only event and category edits bump
+  (``invalidate(content=True)``), so an RSVP rush leaves them cached;
+* ETag / Last-Modified validators for conditional GETs (``list_etag``,
+  ``list_last_modified``), built from the version, the time of the last
+  change and the viewer's state.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+from . import cache, roles
+
+CATALOG = 'catalog'
+CATALOG_CONTENT = 'catalog_content'
+
+
+_MODIFIED_KEY = 'events:catalog:modified'
+
+
+def version():
+    return cache.get_version(CATALOG)
+
+
+def content_version():
+    return cache.get_version(CATALOG_CONTENT)
+
+
+def invalidate(content=False):
+    """Drop cached listings; ``content`` also drops the event card fragments.
+
+    Pass ``content=True`` when event or category fields change, not just seat
+    counts.
+    """
+    if content:
+        cache.bump_version(CATALOG_CONTENT)
+    cache.bump_version(CATALOG)
+    cache.get_cache().set(_MODIFIED_KEY, timezone.now(), timeout=None)
+
+
+def last_modified():
+    """When the catalog last changed; an evicted value restarts at now"""
+    backend = cache.get_cache()
+    modified = backend.get(_MODIFIED_KEY)
+    if modified is None:
+        backend.add(_MODIFIED_KEY, timezone.now(), timeout=None)
+        modified = backend.get(_MODIFIED_KEY)
+    return modified
+
+
+def timeout():
+    return getattr(settings, 'EVENTS_CATALOG_CACHE_TIMEOUT', 300)
+
+
+def normalized_params(request, params):
+    """``(name, value)`` pairs of the known ``params``, stripped, empty ones dropped"""
+    pairs = []
+    for name in params:
+        value = ' '.join(request.GET.get(name, '').split())
+        if value:
+            pairs.append((name, value))
+    return tuple(pairs)
+
+
+def _cacheable(request):
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return False
+    # Flash messages (e.g. "logged out") are per visitor
+    return not len(get_messages(request))
+
+
+def viewer_state(request):
+    """What besides the data makes one visitor's page differ from another's"""
+    user = request.user
+    if not user.is_authenticated:
+        return ('anonymous',)
+    # The CSRF cookie rotates on login; a stale page would carry dead tokens
+    return (
+        user.pk, user.is_superuser, tuple(sorted(roles.get_group_names(user))),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    )
+
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def list_etag(request, *args, **kwargs):
+    """``condition`` etag_func for catalog listings"""
+    if len(get_messages(request)):
+        return None
+    return make_etag(version(), viewer_state(request))
+
+
+def list_last_modified(request, *args, **kwargs):
+    """``condition`` last_modified_func; anonymous only, since the date ignores viewer state"""
+    if request.user.is_authenticated or len(get_messages(request)):
+        return None
+    return last_modified()
+
+
+def cache_anonymous_page(*params):
+    """Serve anonymous GETs of the decorated view from the catalog cache.
+
+    The key holds the path and the normalized values of ``params``; other
+    query parameters must not affect the page. Only 200 responses are
+    stored, and authenticated visitors always get a fresh render.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable(request):
+                return view_func(request, *args, **kwargs)
+
+            backend = cache.get_cache()
+            # Hashed: search text may hold spaces or exceed memcached's key length
+            digest = hashlib.sha1(repr((request.path, normalized_params(request, params))).encode()).hexdigest()
+            key = cache.versioned_key(CATALOG, 'page', digest)
+            cached = backend.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                patch_vary_headers(response, ('Cookie',))
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            patch_vary_headers(response, ('Cookie',))
+            if response.status_code != 200 or response.streaming:
+                return response
+
+            def store(rendered):
+                backend.set(key, (rendered.content, rendered['Content-Type']), timeout())
+
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
+        return wrapper
+    return decorator
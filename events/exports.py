@@ -0,0 +1,94 @@
+"""Streaming CSV / JSON Lines exports of events and attendee lists.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` and encoded
+one line at a time, so memory use does not grow with the number of rows.
+The generators feed both ``StreamingHttpResponse`` and ``manage.py
+export_events``.
+"""
+import csv
+import json
+import re
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Event
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+FORMATS = tuple(CONTENT_TYPES)
+CHUNK_SIZE = 2000
+
+# (column name, queryset lookup)
+EVENT_COLUMNS = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('date', 'date'),
+    ('time', 'time'),
+    ('location', 'location'),
+    ('category', 'category__name'),
+    ('capacity', 'capacity'),
+    ('participant_count', 'participant_count'),
+)
+ATTENDEE_COLUMNS = (
+    ('username', 'username'),
+    ('email', 'email'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('phone_number', 'profile__phone_number'),
+)
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+# Spreadsheets run cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+# ...except signed numbers, phone numbers such as "+8801712345678" and a lone "-"
+NUMERIC_RE = re.compile(r'[+-][\d ().-]*')
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) and not NUMERIC_RE.fullmatch(value):
+        return "'" + value
+    return value
+
+
+def _csv_lines(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def _jsonl_lines(header, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def _stream(queryset, columns, fmt, chunk_size):
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f'Unknown export format {fmt!r}')
+    header = [name for name, _ in columns]
+    rows = queryset.values_list(*[lookup for _, lookup in columns]).iterator(chunk_size=chunk_size)
+    encode = _csv_lines if fmt == 'csv' else _jsonl_lines
+    return encode(header, rows)
+
+
+def export_events(fmt='csv', queryset=None, chunk_size=CHUNK_SIZE):
+    """Yield every event (or those in ``queryset``) as CSV or JSON Lines"""
+    if queryset is None:
+        queryset = Event.objects.all()
+    return _stream(queryset.order_by('date', 'time', 'id'), EVENT_COLUMNS, fmt, chunk_size)
+
+
+def export_attendees(event_id, fmt='csv', chunk_size=CHUNK_SIZE):
+    """Yield the participants of event ``event_id`` with their profile phone"""
+    attendees = User.objects.filter(events_participating_in=event_id).order_by('id')
+    return _stream(attendees, ATTENDEE_COLUMNS, fmt, chunk_size)
@@ -1,8 +1,12 @@
+import codecs
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.forms import PasswordChangeForm, PasswordResetForm, SetPasswordForm
-from django.contrib.auth.models import User
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import UploadedFile
+from . import images, roles
 from .models import Event, Category, UserProfile
 
 
@@ -13,6 +17,13 @@ BASE_INPUT_CLASS = (
 )
 
 
+def clean_upload(value):
+    """Validate and strip metadata from a new upload; existing files pass through"""
+    if isinstance(value, UploadedFile):
+        return images.sanitize(value)
+    return value
+
+
 class EventForm(forms.ModelForm):
     class Meta:
         model = Event
@@ -52,6 +63,76 @@ class EventForm(forms.ModelForm):
 
             widget.attrs["class"] = BASE_INPUT_CLASS
 
+    def clean_image(self):
+        return clean_upload(self.cleaned_data.get('image'))
+
+
+class EventImportForm(forms.Form):
+    file = forms.FileField(
+        help_text='CSV or JSON Lines with name, description, date, time, location, '
+                  'category and optional capacity columns'
+    )
+    format = forms.ChoiceField(
+        choices=[('', 'Detect from file name'), ('csv', 'CSV'), ('jsonl', 'JSON Lines')],
+        required=False,
+    )
+    dry_run = forms.BooleanField(required=False, label='Validate only, do not import')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['file'].widget.attrs.update({'class': BASE_INPUT_CLASS, 'accept': '.csv,.jsonl'})
+        self.fields['format'].widget.attrs.update({'class': BASE_INPUT_CLASS})
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        # Check the encoding up front: rows are imported while the file is decoded
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        try:
+            for chunk in upload.chunks():
+                decoder.decode(chunk)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            raise forms.ValidationError('The file must be UTF-8 encoded.', code='encoding')
+        finally:
+            upload.seek(0)
+        return upload
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get('file')
+        if upload and not cleaned_data.get('format'):
+            extension = upload.name.rsplit('.', 1)[-1].lower()
+            if extension not in ('csv', 'jsonl'):
+                raise forms.ValidationError('Cannot tell the format from the file name; choose one.')
+            cleaned_data['format'] = extension
+        return cleaned_data
+
+
+class BulkRoleForm(forms.Form):
+    users = forms.CharField(
+        widget=forms.Textarea(attrs={'rows': 8}),
+        help_text='Usernames or emails, separated by commas or new lines',
+    )
+    groups = forms.MultipleChoiceField(widget=forms.CheckboxSelectMultiple)
+    mode = forms.ChoiceField(choices=[
+        (roles.GRANT, 'Add to the selected groups'),
+        (roles.REVOKE, 'Remove from the selected groups'),
+        (roles.REPLACE, 'Replace all groups with the selected ones'),
+    ])
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = Group.objects.order_by('name').values_list('name', flat=True)
+        self.fields['groups'].choices = [(name, name) for name in names]
+        self.fields['users'].widget.attrs.update({'class': BASE_INPUT_CLASS})
+        self.fields['mode'].widget.attrs.update({'class': BASE_INPUT_CLASS})
+
+    def clean_users(self):
+        identifiers = self.cleaned_data['users'].replace(',', '\n').split()
+        if not identifiers:
+            raise forms.ValidationError('Enter at least one username or email.')
+        return identifiers
+
 
 class CategoryForm(forms.ModelForm):
     class Meta:
@@ -86,6 +167,9 @@ class SignupForm(UserCreationForm):
                 'class': BASE_INPUT_CLASS
             })
     
+    def clean_profile_picture(self):
+        return clean_upload(self.cleaned_data.get('profile_picture'))
+
     def save(self, commit=True):
         user = super().save(commit=False)
         if commit:
@@ -180,6 +264,9 @@ class UserProfileForm(forms.ModelForm):
                     code='invalid_phone'
                 )
         return phone
+
+    def clean_profile_picture(self):
+        return clean_upload(self.cleaned_data.get('profile_picture'))
     
     def save(self, commit=True):
         profile = super().save(commit=False)
@@ -0,0 +1,165 @@
+"""Upload sanitizing and resized variants for event images and profile pictures.
+
+Uploads are checked for sane dimensions and re-encoded without EXIF or other
+metadata (``sanitize``). Pages never serve the original: ``variant_url``
+returns a fixed-size WebP or JPEG rendition from ``thumbnails/`` in the media
+storage, generating it on first request. ``manage.py generate_thumbnails``
+fills the same cache ahead of time.
+"""
+import hashlib
+import io
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import cache
+
+logger = logging.getLogger(__name__)
+
+# name: (width, height), cropped to fill
+VARIANTS = {
+    'card': (640, 360),
+    'detail': (1280, 720),
+    'avatar': (192, 192),
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+THUMBNAIL_DIR = 'thumbnails'
+# Seconds variant_url remembers a rendition, or that one could not be made
+URL_CACHE_TIMEOUT = 24 * 60 * 60
+MISS_CACHE_TIMEOUT = 5 * 60
+
+# Formats accepted for upload; MPO is the multi-picture JPEG many phones write
+UPLOAD_FORMATS = ('JPEG', 'MPO', 'PNG', 'GIF', 'WEBP')
+MIN_DIMENSION = 64
+MAX_DIMENSION = 8000
+
+ERRORS = (OSError, ValueError, UnidentifiedImageError, Image.DecompressionBombError)
+
+
+def max_dimension():
+    return getattr(settings, 'EVENTS_IMAGE_MAX_DIMENSION', MAX_DIMENSION)
+
+
+def validate_image(upload):
+    """Reject files that are not JPEG/PNG/GIF/WebP images or are too small or too large to resize"""
+    try:
+        upload.seek(0)
+        with Image.open(upload) as image:
+            width, height = image.size
+            fmt = image.format
+    except ERRORS:
+        raise ValidationError('Upload a valid image.', code='invalid_image')
+    finally:
+        upload.seek(0)
+    # Pillow reads some formats (XPM, PSD, ...) that it cannot write back
+    if fmt not in UPLOAD_FORMATS:
+        raise ValidationError('Upload a JPEG, PNG, GIF or WebP image.', code='invalid_image_format')
+    if min(width, height) < MIN_DIMENSION:
+        raise ValidationError(
+            f'Image must be at least {MIN_DIMENSION}x{MIN_DIMENSION} pixels.', code='image_too_small',
+        )
+    if max(width, height) > max_dimension():
+        raise ValidationError(
+            f'Image must be at most {max_dimension()} pixels on each side.', code='image_too_large',
+        )
+
+
+# Pillow writes EXIF, XMP and comments only from info / save options
+KEEP_INFO = ('icc_profile', 'transparency')
+KEEP_ANIMATION_INFO = KEEP_INFO + ('duration', 'loop', 'background', 'disposal', 'blend')
+
+
+def sanitize(upload):
+    """Validate ``upload`` and return it re-encoded without metadata.
+
+    EXIF orientation is applied to the pixels first, so photos stay upright.
+    Multi-picture JPEGs (MPO, from many phone cameras) keep their first frame
+    only; animations keep every frame.
+    """
+    validate_image(upload)
+    with Image.open(upload) as image:
+        fmt = image.format or 'PNG'
+        buffer = io.BytesIO()
+        if fmt == 'MPO':
+            fmt = 'JPEG'
+        elif getattr(image, 'is_animated', False):
+            image.info = {key: value for key, value in image.info.items() if key in KEEP_ANIMATION_INFO}
+            image.save(buffer, format=fmt, save_all=True)
+            return ContentFile(buffer.getvalue(), name=posixpath.basename(upload.name))
+        clean = ImageOps.exif_transpose(image)
+        clean.info = {key: value for key, value in clean.info.items() if key in KEEP_INFO}
+        options = {'quality': 90} if fmt == 'JPEG' else {}
+        clean.save(buffer, format=fmt, **options)
+    return ContentFile(buffer.getvalue(), name=posixpath.basename(upload.name))
+
+
+def variant_name(name, variant, fmt):
+    # Uploaded names are unique (the storage never overwrites), so hash the name
+    digest = hashlib.sha1(name.encode()).hexdigest()[:16]
+    stem = posixpath.splitext(posixpath.basename(name))[0][:40]
+    return posixpath.join(THUMBNAIL_DIR, variant, f'{stem}-{digest}.{fmt}')
+
+
+def fit_size(source, target):
+    """``target`` shrunk to keep its aspect ratio without upscaling ``source``"""
+    scale = min(1, source[0] / target[0], source[1] / target[1])
+    return max(1, round(target[0] * scale)), max(1, round(target[1] * scale))
+
+
+def render_variant(name, variant, fmt, storage=default_storage):
+    """Resize the stored image ``name`` and return the encoded bytes"""
+    pil_format, options = FORMATS[fmt]
+    with storage.open(name, 'rb') as fh, Image.open(fh) as image:
+        image = ImageOps.exif_transpose(image)
+        if pil_format == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGB' if pil_format == 'JPEG' else 'RGBA')
+        image = ImageOps.fit(image, fit_size(image.size, VARIANTS[variant]), method=Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format=pil_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variant(name, variant, fmt, storage=default_storage):
+    """Create the variant file unless it exists; return its storage name"""
+    target = variant_name(name, variant, fmt)
+    if storage.exists(target):
+        return target
+    saved = storage.save(target, ContentFile(render_variant(name, variant, fmt, storage)))
+    if saved != target:
+        # A concurrent request wrote it first; keep theirs
+        storage.delete(saved)
+    return target
+
+
+def variant_url(fieldfile, variant, fmt='jpeg'):
+    """URL of a resized rendition of ``fieldfile``, or of the original if it can't be resized.
+
+    The answer is cached, so card renders neither hit the storage nor retry a
+    failed rendition on every request.
+    """
+    if not fieldfile:
+        return ''
+    backend = cache.get_cache()
+    key = 'events:images:url:' + hashlib.sha1(f'{fieldfile.name}:{variant}:{fmt}'.encode()).hexdigest()
+    url = backend.get(key)
+    if url is not None:
+        return url
+    try:
+        url = fieldfile.storage.url(generate_variant(fieldfile.name, variant, fmt, fieldfile.storage))
+        timeout = URL_CACHE_TIMEOUT
+    except FileNotFoundError:
+        # e.g. the model's default image was never uploaded
+        url, timeout = fieldfile.url, MISS_CACHE_TIMEOUT
+    except ERRORS:
+        logger.warning('Could not create %s %s variant of %s', variant, fmt, fieldfile.name, exc_info=True)
+        url, timeout = fieldfile.url, MISS_CACHE_TIMEOUT
+    backend.set(key, url, timeout)
+    return url
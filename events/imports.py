@@ -0,0 +1,153 @@
+"""Bulk import of events from CSV or JSON Lines.
+
+Rows are parsed one at a time from the input stream and validated with the
+``EventForm`` field rules. Categories are resolved by name through an
+in-memory name -> id map, and any that are missing are created. Valid rows are
+inserted with ``bulk_create`` in batches, each batch in its own transaction,
+and every rejected row is reported with its line number. Because
+``bulk_create`` skips the model signals, each batch is added to the search
+index here and the dashboard and catalog caches are invalidated at the end.
+"""
+import csv
+import json
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import catalog, stats
+from .forms import EventForm
+from .models import Category, Event
+from .search import get_search_backend
+
+FORMATS = ('csv', 'jsonl')
+BATCH_SIZE = 1000
+
+# Columns copied onto Event; "category" (a name) is resolved separately
+EVENT_FIELDS = ('name', 'description', 'date', 'time', 'location', 'capacity')
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    categories_created: int = 0
+    errors: list = field(default_factory=list)  # (line number, message)
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line_number, row_dict)`` from a text stream; bad JSON yields an error string"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_number, f'Invalid JSON: {exc}'
+                continue
+            yield line_number, row if isinstance(row, dict) else 'Expected a JSON object'
+    else:
+        raise ValueError(f'Unknown import format {fmt!r}')
+
+
+def clean_row(row):
+    """Validate one row with the EventForm field rules; return (cleaned, errors)"""
+    cleaned, errors = {}, []
+    for name in EVENT_FIELDS:
+        value = row.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, (bool, int, float)):
+            # JSON numbers: form fields expect the text a browser would post
+            value = str(value)
+        elif value is not None:
+            # A JSON list or object where a scalar was expected
+            errors.append(f'{name}: Enter a valid value.')
+            continue
+        try:
+            cleaned[name] = EventForm.base_fields[name].clean(value)
+        except ValidationError as exc:
+            errors.append(f'{name}: {" ".join(exc.messages)}')
+    category = row.get('category') or ''
+    category = str(category).strip() if isinstance(category, (str, int, float)) else None
+    if category is None:
+        errors.append('category: Enter a valid value.')
+    elif not category:
+        errors.append('category: This field is required.')
+    elif len(category) > Category._meta.get_field('name').max_length:
+        errors.append('category: Name is too long.')
+    cleaned['category'] = category
+    return cleaned, errors
+
+
+class EventImporter:
+    def __init__(self, batch_size=BATCH_SIZE, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.result = ImportResult()
+        # Category names are not unique; the oldest one wins
+        self.category_ids = {}
+        for pk, name in Category.objects.order_by('-id').values_list('id', 'name'):
+            self.category_ids[name] = pk
+
+    def run(self, rows):
+        batch = []
+        for line_number, row in rows:
+            if isinstance(row, str):
+                self.result.errors.append((line_number, row))
+                continue
+            cleaned, errors = clean_row(row)
+            if errors:
+                self.result.errors.append((line_number, '; '.join(errors)))
+                continue
+            batch.append(cleaned)
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        self.flush(batch)
+        if self.result.created and not self.dry_run:
+            stats.invalidate()
+            catalog.invalidate(content=True)
+        return self.result
+
+    def flush(self, batch):
+        if not batch:
+            return
+        missing = {row['category'] for row in batch} - self.category_ids.keys()
+        if self.dry_run:
+            self.category_ids.update(dict.fromkeys(missing))
+            self.result.categories_created += len(missing)
+            self.result.created += len(batch)
+            return
+        with transaction.atomic():
+            self.create_categories(missing)
+            events = Event.objects.bulk_create([
+                Event(
+                    category_id=self.category_ids[row.pop('category')],
+                    **row,
+                )
+                for row in batch
+            ])
+            get_search_backend().index_events(Event.objects.filter(pk__in=[event.pk for event in events]))
+        self.result.created += len(events)
+
+    def create_categories(self, names):
+        if not names:
+            return
+        created = Category.objects.bulk_create([Category(name=name, description='') for name in sorted(names)])
+        for category in created:
+            self.category_ids[category.name] = category.pk
+        self.result.categories_created += len(created)
+
+
+def import_events(stream, fmt, batch_size=BATCH_SIZE, dry_run=False):
+    """Import events from a text ``stream`` in ``fmt`` and return an ``ImportResult``"""
+    return EventImporter(batch_size, dry_run).run(read_rows(stream, fmt))
@@ -0,0 +1,177 @@
+"""Outbound email: an outbox table filled by requests and drained by a worker.
+
+Views and signals only call the ``queue_*`` helpers, which insert
+``OutboundEmail`` rows. ``send_queued`` (run by ``manage.py send_queued_mail``)
+claims due rows in batches and delivers them over a single backend connection
+outside any transaction, retrying failures with exponential backoff.
+"""
+from contextlib import suppress
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from django.contrib.auth.tokens import default_token_generator
+
+from .models import OutboundEmail
+
+SIGNATURE = 'Best regards,\nEvent Management Team'
+
+
+def _display_name(user):
+    return user.get_full_name() or user.username
+
+
+def _event_lines(event):
+    return (
+        f'Event: {event.name}\n'
+        f'Date: {event.date}\n'
+        f'Time: {event.time}\n'
+        f'Location: {event.location}\n\n'
+    )
+
+
+def _build(subject, message, recipient):
+    return OutboundEmail(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient],
+    )
+
+
+def queue_rsvp_confirmations(event, users):
+    """Queue one RSVP confirmation per user in a single insert"""
+    OutboundEmail.objects.bulk_create([
+        _build(
+            f'RSVP Confirmation: {event.name}',
+            f'Hi {_display_name(user)},\n\n'
+            f'You have successfully RSVP\'d to the following event:\n\n'
+            f'{_event_lines(event)}'
+            f'Thank you for your interest!\n\n'
+            f'{SIGNATURE}',
+            user.email,
+        )
+        for user in users if user.email
+    ])
+
+
+def queue_rsvp_cancellation(event, user):
+    if not user.email:
+        return
+    _build(
+        f'RSVP Cancellation: {event.name}',
+        f'Hi {_display_name(user)},\n\n'
+        f'Your RSVP for the following event has been cancelled:\n\n'
+        f'{_event_lines(event)}'
+        f'If this was a mistake, you can RSVP again.\n\n'
+        f'{SIGNATURE}',
+        user.email,
+    ).save()
+
+
+def queue_activation_email(user):
+    if not user.email:
+        return
+    token = default_token_generator.make_token(user)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    activation_link = f"{settings.SITE_URL}{reverse('activate_account', kwargs={'uidb64': uid, 'token': token})}"
+    _build(
+        'Activate Your Account',
+        f'Hi {_display_name(user)},\n\n'
+        f'Thank you for registering! Please click the link below to activate your account:\n\n'
+        f'{activation_link}\n\n'
+        f'If you didn\'t create this account, please ignore this email.\n\n'
+        f'{SIGNATURE}',
+        user.email,
+    ).save()
+
+
+def reclaim_stale(claim_timeout=900):
+    """Return rows claimed more than ``claim_timeout`` seconds ago to the queue"""
+    cutoff = timezone.now() - timedelta(seconds=claim_timeout)
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_SENDING, claimed_at__lt=cutoff,
+    ).update(status=OutboundEmail.STATUS_PENDING)
+
+
+def claim(batch_size=100):
+    """Mark up to ``batch_size`` due rows as sending and return them.
+
+    The transaction covers only the SELECT and one UPDATE. Rows are locked
+    with ``SKIP LOCKED`` where the database supports it, and the claim
+    timestamp identifies this worker's rows should another worker race it
+    on a database without row locks.
+    """
+    claimed_at = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=claimed_at)
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        OutboundEmail.objects.filter(pk__in=ids, status=OutboundEmail.STATUS_PENDING).update(
+            status=OutboundEmail.STATUS_SENDING, claimed_at=claimed_at,
+        )
+    return list(
+        OutboundEmail.objects
+        .filter(pk__in=ids, status=OutboundEmail.STATUS_SENDING, claimed_at=claimed_at)
+        .order_by('next_attempt_at', 'id')
+    )
+
+
+def send_queued(batch_size=100, max_attempts=5, backoff=60, connection=None, claim_timeout=900):
+    """Deliver one batch of due messages; return ``(sent, failed)``.
+
+    Rows are claimed in a short transaction and sent outside of any, so SMTP
+    round trips never hold database locks; each outcome is written by its own
+    UPDATE. Failed sends are retried after ``backoff * 2 ** (attempts - 1)``
+    seconds until ``max_attempts`` is reached, then marked failed. Rows left
+    in ``sending`` by a worker that died are retried after ``claim_timeout``
+    seconds.
+    """
+    reclaim_stale(claim_timeout)
+    batch = claim(batch_size)
+    owns_connection = connection is None
+    connection = connection or get_connection()
+    sent = failed = 0
+    for email in batch:
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=email.from_email,
+            to=email.to,
+            connection=connection,
+        )
+        attempts = email.attempts + 1
+        try:
+            # Opens the connection on first use and keeps it open afterwards
+            connection.open()
+            message.send()
+        except Exception as e:
+            # open() is a no-op while a connection is set: drop a broken
+            # one so the next message reconnects
+            with suppress(Exception):
+                connection.close()
+            if attempts >= max_attempts:
+                outcome = {'status': OutboundEmail.STATUS_FAILED}
+            else:
+                outcome = {
+                    'status': OutboundEmail.STATUS_PENDING,
+                    'next_attempt_at': timezone.now() + timedelta(seconds=backoff * 2 ** (attempts - 1)),
+                }
+            outcome['last_error'] = str(e)
+            failed += 1
+        else:
+            outcome = {'status': OutboundEmail.STATUS_SENT, 'sent_at': timezone.now(), 'last_error': ''}
+            sent += 1
+        OutboundEmail.objects.filter(pk=email.pk).update(attempts=attempts, **outcome)
+    if owns_connection:
+        connection.close()
+    return sent, failed
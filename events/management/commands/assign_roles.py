@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events import roles
+
+
+class Command(BaseCommand):
+    help = 'Grant, revoke or replace group memberships for many users in one transaction'
+    # call_command(..., stdin=...) feeds --file -
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument('groups', nargs='+', help='Group names, e.g. Organizer')
+        parser.add_argument('--users', nargs='*', default=[], help='Usernames or emails')
+        parser.add_argument('--file', help='File with one username or email per line, or - for stdin')
+        parser.add_argument('--mode', choices=roles.MODES, default=roles.GRANT)
+
+    def handle(self, *args, **options):
+        identifiers = list(options['users'])
+        if options['file'] == '-':
+            identifiers += options.get('stdin', sys.stdin).read().split()
+        elif options['file']:
+            try:
+                with open(options['file'], encoding='utf-8') as fh:
+                    identifiers += fh.read().split()
+            except OSError as exc:
+                raise CommandError(exc)
+        if not identifiers:
+            raise CommandError('Pass --users and/or --file.')
+
+        user_ids, unmatched = roles.find_user_ids(identifiers)
+        for identifier in sorted(unmatched):
+            self.stderr.write(f'No user matches {identifier!r}')
+        try:
+            change = roles.change_roles(user_ids, options['groups'], options['mode'])
+        except ValueError as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(
+            f'{change.users} user(s): {change.added} membership(s) added, {change.removed} removed'
+        ))
@@ -0,0 +1,177 @@
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(samples)))
+    return samples[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and report latency percentiles, SQL query '
+        'counts and peak memory for the main event views as JSON'
+    )
+
+    VIEWS = ('event_list', 'event_detail', 'dashboard', 'organizer_dashboard',
+             'admin_dashboard', 'rsvp_event', 'user_list')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--events', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--rsvps-per-event', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per view')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per view before measuring')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the dataset')
+        parser.add_argument('--views', nargs='+', choices=self.VIEWS, default=list(self.VIEWS))
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1.')
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            call_command(
+                'seed_data',
+                users=options['users'],
+                events=options['events'],
+                categories=options['categories'],
+                rsvps_per_event=options['rsvps_per_event'],
+                batch_size=options['batch_size'],
+                seed=options['seed'],
+                atomic=True,
+                stdout=self.stderr,
+            )
+            # QueryTimingMiddleware would add its own overhead to every sample
+            with override_settings(EVENTS_TIMING_SAMPLE_RATE=0):
+                report = {
+                    'meta': self.metadata(options),
+                    'views': self.run(options),
+                }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Benchmark report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def metadata(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'dataset': {
+                key: options[key] for key in ('users', 'events', 'categories', 'rsvps_per_event', 'seed')
+            },
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+        }
+
+    def run(self, options):
+        user = User.objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark')
+        # Give the benchmark user RSVPs so the default dashboard filter has rows
+        events = list(Event.objects.values_list('id', flat=True)[:options['rsvps_per_event']])
+        Event.participants.through.objects.bulk_create([
+            Event.participants.through(event_id=event_id, user_id=user.pk) for event_id in events
+        ])
+        Event.objects.filter(pk__in=events).recount_participants()
+        busiest = Event.objects.order_by('-participant_count', 'id').values_list('id', flat=True).first()
+
+        client = Client()
+        client.force_login(user)
+
+        rsvp_toggle = {'flag': False}
+
+        def rsvp():
+            # Alternate RSVP and cancel so every sample does real work
+            rsvp_toggle['flag'] = not rsvp_toggle['flag']
+            action = 'rsvp' if rsvp_toggle['flag'] else 'cancel_rsvp'
+            return client.post(reverse('rsvp_event', args=[busiest]), {'action': action})
+
+        requests = {
+            'event_list': lambda: client.get(reverse('event_list')),
+            'event_detail': lambda: client.get(reverse('event_detail', args=[busiest])),
+            'dashboard': lambda: client.get(reverse('dashboard')),
+            'organizer_dashboard': lambda: client.get(reverse('organizer_dashboard')),
+            'admin_dashboard': lambda: client.get(reverse('admin_dashboard')),
+            'rsvp_event': rsvp,
+            'user_list': lambda: client.get(reverse('user_list')),
+        }
+
+        results = {}
+        for name in options['views']:
+            results[name] = self.measure(requests[name], options['iterations'], options['warmup'])
+        return results
+
+    def measure(self, send, iterations, warmup):
+        for _ in range(warmup):
+            send()
+
+        timings = []
+        queries = []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = send()
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(ctx))
+
+        # Memory is sampled separately; tracemalloc would distort the timings
+        tracemalloc.start()
+        send()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'status': response.status_code,
+            'queries': max(queries),
+            'min_ms': round(timings[0], 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p90_ms': round(percentile(timings, 90), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'max_ms': round(timings[-1], 3),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
@@ -0,0 +1,82 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from events.models import Category, Event
+from events.pagination import KeysetPaginator
+from events.views import EventListView
+
+
+class Command(BaseCommand):
+    help = (
+        'Request the main views, capture the SELECT statements they run and print '
+        'the database EXPLAIN plan for each, to confirm the indexes are used'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to request the pages as (default: first superuser)')
+        parser.add_argument('--analyze', action='store_true', help='Use EXPLAIN ANALYZE where supported (runs the queries)')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('id').first()
+        if user is None:
+            raise CommandError('No user to request the pages as; create a superuser or pass --user.')
+
+        client = Client()
+        client.force_login(user)
+
+        for label, url in self.pages():
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{label}  GET {url}  -> {response.status_code}'))
+            for query in ctx.captured_queries:
+                sql = query['sql']
+                # Session and auth lookups are primary-key hits on every request
+                if not sql.startswith('SELECT') or 'django_session' in sql:
+                    continue
+                self.stdout.write(self.style.SQL_KEYWORD(sql))
+                for line in self.explain(sql, options['analyze']):
+                    self.stdout.write(f'    {line}')
+                self.stdout.write('')
+
+    def pages(self):
+        event = Event.objects.order_by('id').first()
+        category = Category.objects.order_by('id').first()
+        pages = [
+            ('event_list', reverse('event_list')),
+            ('event_list (date range)', reverse('event_list') + '?start=2000-01-01&end=2100-01-01'),
+            ('event_list (search)', reverse('event_list') + '?search=event'),
+        ]
+        if event:
+            # An empty cursor is offset mode; seek past the first event instead
+            cursor = KeysetPaginator(Event.objects.all(), EventListView.ordering, 1).cursor_for(
+                Event.objects.order_by(*EventListView.ordering).first(), 'next',
+            )
+            pages.append(('event_list (keyset)', reverse('event_list') + f'?cursor={cursor}'))
+        if category:
+            pages.append(('event_list (category)', reverse('event_list') + f'?category={category.pk}'))
+        for mode in ('rsvp', 'upcoming', 'past', 'all', 'today'):
+            pages.append((f'dashboard ({mode})', reverse('dashboard') + f'?filter={mode}'))
+        pages += [
+            ('organizer_dashboard', reverse('organizer_dashboard')),
+            ('admin_dashboard', reverse('admin_dashboard')),
+            ('category_list', reverse('category_list')),
+            ('user_list', reverse('user_list')),
+            ('group_list', reverse('group_list')),
+        ]
+        if event:
+            pages.append(('event_detail', reverse('event_detail', args=[event.pk])))
+        return pages
+
+    def explain(self, sql, analyze):
+        options = {'analyze': True} if analyze and connection.vendor == 'postgresql' else {}
+        prefix = connection.ops.explain_query_prefix(**options)
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}')
+            return [' | '.join(str(col) for col in row) for row in cursor.fetchall()]
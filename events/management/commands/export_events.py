@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events import exports
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Stream all events, or the attendees of one event, as CSV or JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=exports.FORMATS, default='csv')
+        parser.add_argument('--attendees', type=int, metavar='EVENT_ID', help='Export the participants of this event')
+        parser.add_argument('--output', help='Write to this file instead of stdout')
+        parser.add_argument('--chunk-size', type=int, default=exports.CHUNK_SIZE, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        if options['attendees'] is not None:
+            if not Event.objects.filter(pk=options['attendees']).exists():
+                raise CommandError(f"Event {options['attendees']} does not exist.")
+            lines = exports.export_attendees(options['attendees'], options['format'], options['chunk_size'])
+        else:
+            lines = exports.export_events(options['format'], chunk_size=options['chunk_size'])
+
+        if options['output']:
+            count = 0
+            with open(options['output'], 'w', newline='', encoding='utf-8') as fh:
+                for line in lines:
+                    fh.write(line)
+                    count += 1
+            self.stderr.write(self.style.SUCCESS(f"Wrote {count} line(s) to {options['output']}"))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,43 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from events import images
+from events.models import Event, UserProfile
+
+# (model, image field, variants served for it)
+SOURCES = (
+    (Event, 'image', ('card', 'detail')),
+    (UserProfile, 'profile_picture', ('avatar',)),
+)
+
+
+class Command(BaseCommand):
+    help = 'Create the resized WebP/JPEG variants of event images and profile pictures ahead of time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render variants that already exist')
+
+    def handle(self, *args, **options):
+        created = failed = 0
+        for model, field, variants in SOURCES:
+            names = (
+                model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                .order_by().values_list(field, flat=True).distinct().iterator()
+            )
+            for name in names:
+                for variant in variants:
+                    for fmt in images.FORMATS:
+                        target = images.variant_name(name, variant, fmt)
+                        if options['force'] and default_storage.exists(target):
+                            default_storage.delete(target)
+                        elif default_storage.exists(target):
+                            continue
+                        try:
+                            images.generate_variant(name, variant, fmt)
+                        except images.ERRORS as exc:
+                            failed += 1
+                            self.stderr.write(f'{name} ({variant}, {fmt}): {exc}')
+                        else:
+                            created += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Created {created} variant(s); {failed} failed'))
@@ -0,0 +1,53 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events import imports
+
+
+class Command(BaseCommand):
+    help = 'Bulk import events from a CSV or JSON Lines file, creating missing categories'
+    # call_command(..., stdin=...) feeds the - path, as loaddata does
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - for stdin')
+        parser.add_argument(
+            '--format', choices=imports.FORMATS,
+            help='Input format; defaults to the file extension',
+        )
+        parser.add_argument('--batch-size', type=int, default=imports.BATCH_SIZE, help='Rows per INSERT')
+        parser.add_argument('--dry-run', action='store_true', help='Validate rows without writing anything')
+        parser.add_argument('--max-errors', type=int, default=50, help='Rejected rows listed in the report')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in imports.FORMATS:
+            raise CommandError('Cannot tell the format from the file name; pass --format.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        if path == '-':
+            result = imports.import_events(options.get('stdin', sys.stdin), fmt, options['batch_size'], options['dry_run'])
+        else:
+            try:
+                # utf-8-sig: spreadsheets often prepend a BOM to CSV exports
+                with open(path, newline='', encoding='utf-8-sig') as fh:
+                    result = imports.import_events(fh, fmt, options['batch_size'], options['dry_run'])
+            except OSError as exc:
+                raise CommandError(exc)
+            except UnicodeDecodeError as exc:
+                raise CommandError(f'{path} is not UTF-8 encoded ({exc}); batches before the error were imported.')
+
+        for line_number, message in result.errors[:options['max_errors']]:
+            self.stderr.write(f'line {line_number}: {message}')
+        if result.failed > options['max_errors']:
+            self.stderr.write(f'... and {result.failed - options["max_errors"]} more rejected row(s)')
+
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {result.created} event(s), created {result.categories_created} '
+            f'category(ies), rejected {result.failed} row(s)'
+        ))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F
+
+from events import catalog
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Recompute Event.participant_count from the participants table and fix any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report events whose counter has drifted')
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Events updated per UPDATE statement, to keep locks short on large tables',
+        )
+
+    def handle(self, *args, **options):
+        drifted = (
+            Event.objects.annotate(actual=Count('participants'))
+            .exclude(participant_count=F('actual'))
+            .count()
+        )
+        if options['dry_run']:
+            self.stdout.write(f'{drifted} event(s) have a drifted participant_count')
+            return
+
+        updated = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Event.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            updated += Event.objects.filter(pk__gte=ids[0], pk__lte=ids[-1]).recount_participants()
+            last_id = ids[-1]
+
+        if drifted:
+            catalog.invalidate()
+        self.stdout.write(
+            self.style.SUCCESS(f'Recounted {updated} event(s); {drifted} had drifted')
+        )
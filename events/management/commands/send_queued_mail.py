@@ -0,0 +1,49 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from events.mail import send_queued
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbound email in batches over one reused mail connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Messages sent per batch')
+        parser.add_argument('--max-attempts', type=int, default=5, help='Give up on a message after this many failures')
+        parser.add_argument('--backoff', type=int, default=60, help='Base retry delay in seconds, doubled on each failure')
+        parser.add_argument(
+            '--claim-timeout', type=int, default=900,
+            help='Seconds after which messages claimed by a worker that died are sent again',
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox instead of exiting once it is drained')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep between polls with --loop')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        connection = get_connection()
+        try:
+            while True:
+                sent, failed = send_queued(
+                    batch_size=options['batch_size'],
+                    max_attempts=options['max_attempts'],
+                    backoff=options['backoff'],
+                    connection=connection,
+                    claim_timeout=options['claim_timeout'],
+                )
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    continue
+                if not options['loop']:
+                    break
+                # Don't hold an idle SMTP session open between polls
+                connection.close()
+                time.sleep(options['interval'])
+        finally:
+            connection.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Sent {total_sent} email(s), {total_failed} failed attempt(s)')
+        )
@@ -0,0 +1,83 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('events.timing')
+
+
+class QueryRecorder:
+    """``execute_wrapper`` hook that counts and times every SQL statement"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.total += duration
+            if duration > self.slowest:
+                self.slowest = duration
+                self.slowest_sql = sql
+
+
+class QueryTimingMiddleware:
+    """Record wall time, SQL count, SQL time and the slowest statement per request.
+
+    A fraction ``EVENTS_TIMING_SAMPLE_RATE`` of requests is measured (none
+    unless set; the settings enable it under DEBUG). Measured
+    responses carry a ``Server-Timing`` header and produce one JSON log line on
+    the ``events.timing`` logger, at WARNING level when the request took longer
+    than ``EVENTS_SLOW_REQUEST_MS``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = getattr(settings, 'EVENTS_TIMING_SAMPLE_RATE', 0.0)
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.total * 1000
+
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={elapsed_ms:.1f}',
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries"',
+            f'db-slowest;dur={recorder.slowest * 1000:.1f}',
+        ])
+
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'query': request.GET.urlencode(),
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(elapsed_ms, 1),
+            'db_queries': recorder.count,
+            'db_ms': round(db_ms, 1),
+            'slowest_sql_ms': round(recorder.slowest * 1000, 1),
+            'slowest_sql': recorder.slowest_sql[:500],
+        }
+        slow = elapsed_ms >= getattr(settings, 'EVENTS_SLOW_REQUEST_MS', 500)
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record), extra={'timing': record})
+        return response
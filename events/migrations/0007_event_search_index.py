@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE events_event_fts USING fts5("
+    "name, location, description, category, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+SQLITE_POPULATE = (
+    "INSERT INTO events_event_fts (rowid, name, location, description, category) "
+    "SELECT e.id, e.name, e.location, e.description, c.name "
+    "FROM events_event e JOIN events_category c ON c.id = e.category_id"
+)
+
+POSTGRES_CREATE = [
+    "CREATE TABLE events_event_search ("
+    "event_id bigint PRIMARY KEY REFERENCES events_event (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX events_event_search_document_idx ON events_event_search USING GIN (document)",
+]
+POSTGRES_POPULATE = (
+    "INSERT INTO events_event_search (event_id, document) "
+    "SELECT e.id, "
+    "setweight(to_tsvector(%s::regconfig, coalesce(e.name, '')), 'A') || "
+    "setweight(to_tsvector(%s::regconfig, coalesce(c.name, '')), 'B') || "
+    "setweight(to_tsvector(%s::regconfig, coalesce(e.location, '')), 'B') || "
+    "setweight(to_tsvector(%s::regconfig, coalesce(e.description, '')), 'C') "
+    "FROM events_event e JOIN events_category c ON c.id = e.category_id"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(SQLITE_CREATE)
+        except OperationalError:
+            # SQLite built without FTS5: events.search falls back to LIKE matching
+            return
+        schema_editor.execute(SQLITE_POPULATE)
+    elif vendor == 'postgresql':
+        for statement in POSTGRES_CREATE:
+            schema_editor.execute(statement)
+        # Same configuration as the queries in events.search
+        config = getattr(settings, 'EVENTS_SEARCH_CONFIG', 'english')
+        schema_editor.execute(POSTGRES_POPULATE, (config,) * 4)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS events_event_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE IF EXISTS events_event_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_outboundemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
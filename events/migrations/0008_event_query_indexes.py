@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'time', 'id'], name='events_event_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'date', 'time'], name='events_event_cat_date_idx'),
+        ),
+        # "My RSVPs" lookups go user -> events; the auto-created unique index is (event_id, user_id)
+        migrations.RunSQL(
+            'CREATE INDEX events_event_participants_user_event_idx '
+            'ON events_event_participants (user_id, event_id)',
+            'DROP INDEX events_event_participants_user_event_idx',
+        ),
+    ]
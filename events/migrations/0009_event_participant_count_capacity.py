@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:27
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_participants(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Participation = Event.participants.through
+    counts = (
+        Participation.objects.filter(event=OuterRef('pk'))
+        .order_by().values('event').annotate(total=Count('*')).values('total')
+    )
+    Event.objects.update(
+        participant_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_event_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Leave empty for unlimited seats', null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_participants, migrations.RunPython.noop),
+    ]
@@ -2,8 +2,12 @@ from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 import os
 
+from . import images
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -13,6 +17,39 @@ class Category(models.Model):
         return self.name
 
 
+class EventQuerySet(models.QuerySet):
+    def with_attendance(self, user):
+        """Annotate ``user_is_attending`` for ``user`` with a single EXISTS subquery"""
+        if not user or not user.is_authenticated:
+            return self.annotate(user_is_attending=models.Value(False, output_field=models.BooleanField()))
+        rsvps = Event.participants.through.objects.filter(event_id=models.OuterRef('pk'), user_id=user.pk)
+        return self.annotate(user_is_attending=models.Exists(rsvps))
+
+    def reserve_seat(self, pk) -> bool:
+        """Atomically take a seat on event ``pk``; False if the event is full.
+
+        A single conditional ``UPDATE ... WHERE participant_count < capacity``
+        so concurrent sign-ups cannot oversell.
+        """
+        has_room = models.Q(capacity__isnull=True) | models.Q(participant_count__lt=models.F('capacity'))
+        return self.filter(has_room, pk=pk).update(
+            participant_count=models.F('participant_count') + 1, updated_at=timezone.now(),
+        ) == 1
+
+    def release_seat(self, pk) -> None:
+        self.filter(pk=pk, participant_count__gt=0).update(
+            participant_count=models.F('participant_count') - 1, updated_at=timezone.now(),
+        )
+
+    def recount_participants(self) -> int:
+        """Reset ``participant_count`` from the through table in one UPDATE"""
+        rsvps = (
+            Event.participants.through.objects.filter(event_id=models.OuterRef('pk'))
+            .order_by().values('event_id').annotate(total=models.Count('*')).values('total')
+        )
+        return self.update(participant_count=Coalesce(models.Subquery(rsvps), 0), updated_at=timezone.now())
+
+
 class Event(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField()
@@ -26,10 +63,55 @@ class Event(models.Model):
         blank=True,
         related_name="events_participating_in",
     )
+    # Denormalized len(participants), kept in sync by rsvp_event and events.signals
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
+    capacity = models.PositiveIntegerField(blank=True, null=True, help_text='Leave empty for unlimited seats')
+    # Also bumped by seat and counter updates; the event page's Last-Modified/ETag
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Listing order (date, time, id) and the date filters on every dashboard
+            models.Index(fields=['date', 'time', 'id'], name='events_event_date_time_idx'),
+            # Category filter on the event list, which is also ordered by date
+            models.Index(fields=['category', 'date', 'time'], name='events_event_cat_date_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def is_full(self):
+        return self.capacity is not None and self.participant_count >= self.capacity
+
+    @property
+    def seats_left(self):
+        if self.capacity is None:
+            return None
+        return max(self.capacity - self.participant_count, 0)
+
+    def image_variant_url(self, variant, fmt='jpeg'):
+        """URL of a resized rendition of the event image (see ``events.images``)"""
+        return images.variant_url(self.image, variant, fmt)
+
+    @property
+    def card_image_url(self):
+        return self.image_variant_url('card')
+
+    @property
+    def card_image_webp_url(self):
+        return self.image_variant_url('card', 'webp')
+
+    @property
+    def detail_image_url(self):
+        return self.image_variant_url('detail')
+
+    @property
+    def detail_image_webp_url(self):
+        return self.image_variant_url('detail', 'webp')
+
 
 class UserProfile(models.Model):
     """Extended user profile with additional information and phone number validation"""
@@ -69,11 +151,21 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username}'s Profile"
     
-    def get_profile_picture_url(self):
-        """Get profile picture URL or return default"""
+    def get_profile_picture_url(self, variant=None, fmt='jpeg'):
+        """Get profile picture URL, resized to ``variant`` if given, or return default"""
         if self.profile_picture:
+            if variant:
+                return images.variant_url(self.profile_picture, variant, fmt)
             return self.profile_picture.url
         return '/static/images/default_profile.jpg'
+
+    @property
+    def avatar_url(self):
+        return self.get_profile_picture_url('avatar')
+
+    @property
+    def avatar_webp_url(self):
+        return self.get_profile_picture_url('avatar', 'webp')
     
     def is_phone_valid(self):
         """Check if phone number is valid"""
@@ -83,4 +175,42 @@ class UserProfile(models.Model):
             self.full_clean()
             return True
         except:
-            return False
\ No newline at end of file
+            return False
+
+
+class OutboundEmail(models.Model):
+    """Email queued by views and signals, delivered by the ``send_queued_mail`` worker"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    # Set when a worker takes the row; a stale claim means the worker died mid-batch
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='events_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
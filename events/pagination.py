@@ -0,0 +1,110 @@
+"""Keyset (cursor) pagination.
+
+Instead of ``OFFSET n`` and a ``COUNT(*)`` of the whole result, each page is
+fetched with a ``WHERE`` on the ordering columns of the last row seen, so page
+N costs the same as page 1 when those columns are indexed. Cursors are opaque
+URL-safe strings holding the boundary row's ordering values.
+"""
+import base64
+import binascii
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = paginator.cursor_for(object_list[-1], 'next') if has_next and object_list else None
+        self.previous_cursor = paginator.cursor_for(object_list[0], 'previous') if has_previous and object_list else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class KeysetPaginator:
+    """Paginate ``queryset`` by ``ordering``, e.g. ``('date', 'time', 'id')``.
+
+    Fields may be prefixed with ``-`` for descending order. The last field must
+    be unique (normally the primary key) and none of them may be NULL.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+
+    def cursor_for(self, obj, direction):
+        payload = {
+            'd': 'n' if direction == 'next' else 'p',
+            'v': [getattr(obj, field) for field in self.fields],
+        }
+        raw = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            direction, values = payload['d'], payload['v']
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise InvalidCursor('Malformed cursor')
+        if direction not in ('n', 'p') or not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor('Malformed cursor')
+        opts = self.queryset.model._meta
+        try:
+            values = [opts.get_field(field).to_python(value) for field, value in zip(self.fields, values)]
+        except Exception:
+            raise InvalidCursor('Malformed cursor')
+        return direction, values
+
+    def _boundary(self, values, forward):
+        """Rows strictly after (or before) ``values`` in the paginator ordering"""
+        condition = Q()
+        for i, field in enumerate(self.fields):
+            ascending = not self.descending[i]
+            lookup = 'gt' if ascending == forward else 'lt'
+            term = Q(**{f'{field}__{lookup}': values[i]})
+            for prev_field, prev_value in zip(self.fields[:i], values[:i]):
+                term &= Q(**{prev_field: prev_value})
+            condition |= term
+        return condition
+
+    def page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor) if cursor else ('n', None)
+        if direction == 'n':
+            queryset = self.queryset.order_by(*self.ordering)
+            if values is not None:
+                queryset = queryset.filter(self._boundary(values, forward=True))
+            rows = list(queryset[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self, len(rows) > self.per_page, values is not None)
+
+        reverse_ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+        queryset = self.queryset.order_by(*reverse_ordering).filter(self._boundary(values, forward=False))
+        rows = list(queryset[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return KeysetPage(rows, self, True, has_previous)
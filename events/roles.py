@@ -0,0 +1,144 @@
+"""Role resolution for the Admin / Organizer / Participant groups.
+
+A user's group names are loaded with a single query the first time they are
+needed and memoised on the user object. ``request.user`` lives for exactly one
+request, so every permission check, decorator and template filter in that
+request shares the same lookup.
+
+``change_roles`` is the write side: it applies membership changes for many
+users at once as set differences on the ``User.groups`` through table.
+"""
+from dataclasses import dataclass
+
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models import Q
+
+ADMIN = "Admin"
+ORGANIZER = "Organizer"
+PARTICIPANT = "Participant"
+
+SYSTEM_GROUPS = (ADMIN, ORGANIZER, PARTICIPANT)
+
+_CACHE_ATTR = "_group_names_cache"
+
+
+def get_group_names(user) -> frozenset:
+    """Return the names of the groups ``user`` belongs to (cached per user object)."""
+    if not user or not getattr(user, "is_authenticated", False):
+        return frozenset()
+    try:
+        return getattr(user, _CACHE_ATTR)
+    except AttributeError:
+        names = frozenset(user.groups.values_list("name", flat=True))
+        setattr(user, _CACHE_ATTR, names)
+        return names
+
+
+def invalidate_group_names(user) -> None:
+    """Forget the cached group names so the next check hits the database again."""
+    if user is not None and hasattr(user, _CACHE_ATTR):
+        delattr(user, _CACHE_ATTR)
+
+
+def in_group(user, group_name: str) -> bool:
+    return group_name in get_group_names(user)
+
+
+def is_admin(user) -> bool:
+    return bool(getattr(user, "is_superuser", False)) or in_group(user, ADMIN)
+
+
+def is_organizer(user) -> bool:
+    # Admins are allowed everywhere
+    return is_admin(user) or in_group(user, ORGANIZER)
+
+
+def is_participant(user) -> bool:
+    # Admins and Organizers are allowed everywhere
+    return is_organizer(user) or in_group(user, PARTICIPANT)
+
+
+GRANT = "grant"
+REVOKE = "revoke"
+REPLACE = "replace"
+MODES = (GRANT, REVOKE, REPLACE)
+
+# Keep IN (...) lists well below SQLite's bound-parameter limit
+_CHUNK_SIZE = 500
+
+
+@dataclass(frozen=True)
+class RoleChange:
+    users: int
+    added: int
+    removed: int
+
+
+def _chunks(values):
+    values = sorted(values)
+    for start in range(0, len(values), _CHUNK_SIZE):
+        yield values[start:start + _CHUNK_SIZE]
+
+
+def resolve_groups(group_names) -> dict:
+    """Map group names to ids in one query; ValueError names any unknown group"""
+    names = set(group_names)
+    groups = dict(Group.objects.filter(name__in=names).values_list("name", "id"))
+    unknown = names - groups.keys()
+    if unknown:
+        raise ValueError(f"Unknown group(s): {', '.join(sorted(unknown))}")
+    return groups
+
+
+def find_user_ids(identifiers):
+    """Resolve usernames or emails to user ids; return ``(ids, unmatched identifiers)``"""
+    identifiers = {value.strip() for value in identifiers if value.strip()}
+    found = set()
+    ids = set()
+    for chunk in _chunks(identifiers):
+        for pk, username, email in User.objects.filter(
+            Q(username__in=chunk) | Q(email__in=chunk)
+        ).values_list("id", "username", "email"):
+            ids.add(pk)
+            found.update((username, email))
+    return ids, identifiers - found
+
+
+def change_roles(user_ids, group_names, mode=GRANT) -> RoleChange:
+    """Grant, revoke or replace the groups of many users in one transaction.
+
+    Only the missing memberships are inserted and only the surplus ones
+    deleted, so re-running the same change is a no-op. ``replace`` leaves each
+    user in exactly ``group_names``.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}")
+    from . import stats  # stats imports this module
+
+    group_ids = set(resolve_groups(group_names).values())
+    user_ids = set(user_ids)
+    Membership = User.groups.through
+    added = removed = 0
+    with transaction.atomic():
+        for chunk in _chunks(user_ids):
+            memberships = Membership.objects.filter(user_id__in=chunk)
+            if mode != REPLACE:
+                memberships = memberships.filter(group_id__in=group_ids)
+            existing = set(memberships.values_list("user_id", "group_id"))
+            wanted = set() if mode == REVOKE else {(u, g) for u in chunk for g in group_ids}
+
+            to_add = wanted - existing
+            to_remove = existing if mode == REVOKE else existing - wanted
+            Membership.objects.bulk_create(
+                [Membership(user_id=u, group_id=g) for u, g in to_add], ignore_conflicts=True,
+            )
+            added += len(to_add)
+            for group_id in {g for _, g in to_remove}:
+                removed += Membership.objects.filter(
+                    group_id=group_id, user_id__in=[u for u, g in to_remove if g == group_id],
+                ).delete()[0]
+    if added or removed:
+        # bulk_create and queryset deletes bypass the m2m_changed handlers
+        stats.invalidate()
+    return RoleChange(users=len(user_ids), added=added, removed=removed)
@@ -0,0 +1,74 @@
+"""RSVP and cancellation for a single user and event.
+
+Both operations work on the participants through table directly, so they
+never load the attendee list, and run inside ``transaction.atomic``. The seat
+counter on ``Event`` is taken with a conditional UPDATE before the insert, and
+the unique ``(event, user)`` constraint settles concurrent double clicks.
+Because the m2m signals are bypassed, the confirmation email and the
+dashboard and catalog cache invalidation happen here.
+"""
+from dataclasses import dataclass
+
+from django.db import IntegrityError, transaction
+
+from . import catalog, mail, stats
+from .models import Event
+
+Participation = Event.participants.through
+
+ATTENDING = 'attending'
+ALREADY_ATTENDING = 'already_attending'
+FULL = 'full'
+CANCELLED = 'cancelled'
+NOT_ATTENDING = 'not_attending'
+
+
+@dataclass(frozen=True)
+class RSVPResult:
+    event_id: int
+    status: str
+
+    @property
+    def attending(self):
+        return self.status in (ATTENDING, ALREADY_ATTENDING)
+
+    @property
+    def changed(self):
+        return self.status in (ATTENDING, CANCELLED)
+
+
+def is_attending(event, user) -> bool:
+    return Participation.objects.filter(event_id=event.pk, user_id=user.pk).exists()
+
+
+def rsvp(event, user) -> RSVPResult:
+    """Add ``user`` to ``event`` unless already attending or the event is full"""
+    with transaction.atomic():
+        if is_attending(event, user):
+            return RSVPResult(event.pk, ALREADY_ATTENDING)
+        if not Event.objects.reserve_seat(event.pk):
+            return RSVPResult(event.pk, FULL)
+        try:
+            with transaction.atomic():
+                Participation.objects.create(event_id=event.pk, user_id=user.pk)
+        except IntegrityError:
+            # A concurrent request inserted the same row first: give the seat back
+            Event.objects.release_seat(event.pk)
+            return RSVPResult(event.pk, ALREADY_ATTENDING)
+        mail.queue_rsvp_confirmations(event, [user])
+    stats.invalidate()
+    catalog.invalidate()
+    return RSVPResult(event.pk, ATTENDING)
+
+
+def cancel(event, user) -> RSVPResult:
+    """Remove ``user`` from ``event``; a no-op if they were not attending"""
+    with transaction.atomic():
+        deleted, _ = Participation.objects.filter(event_id=event.pk, user_id=user.pk).delete()
+        if not deleted:
+            return RSVPResult(event.pk, NOT_ATTENDING)
+        Event.objects.release_seat(event.pk)
+        mail.queue_rsvp_cancellation(event, user)
+    stats.invalidate()
+    catalog.invalidate()
+    return RSVPResult(event.pk, CANCELLED)
@@ -0,0 +1,179 @@
+"""Full-text search over events.
+
+Each backend keeps a search index of event name, location, description and
+category name in a side table, kept in sync by ``events.signals``:
+
+* ``SQLiteFTSBackend``: an FTS5 virtual table ranked with bm25.
+* ``PostgresSearchBackend``: a weighted ``tsvector`` column with a GIN index,
+  ranked with ``ts_rank``.
+* ``BasicSearchBackend``: unindexed ``icontains`` fallback for other databases.
+
+Every backend matches word prefixes ("conf" finds "conference") and annotates
+``search_rank`` where higher means more relevant. A query without any word
+characters (see ``search_terms``) is no search: views skip the backend and
+backends leave the queryset unfiltered. ``EVENTS_SEARCH_BACKEND`` may name a backend class
+by dotted path; by default it is chosen from the database vendor.
+"""
+import functools
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    return WORD_RE.findall(query or '')
+
+
+class BasicSearchBackend:
+    def unranked(self, queryset):
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def filter(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return self.unranked(queryset)
+        for term in terms:
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(location__icontains=term)
+                | Q(description__icontains=term) | Q(category__name__icontains=term)
+            )
+        return self.unranked(queryset)
+
+    def index_events(self, queryset):
+        pass
+
+    def remove_events(self, event_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class SQLiteFTSBackend(BasicSearchBackend):
+    table = 'events_event_fts'
+
+    def match_expression(self, terms):
+        # Quoted tokens can't be parsed as FTS5 operators; * makes them prefixes
+        return ' '.join('"%s"*' % term for term in terms)
+
+    def filter(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return self.unranked(queryset)
+        match = self.match_expression(terms)
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', (match,)),
+        ).annotate(search_rank=RawSQL(
+            # Weights: name, location, description, category
+            f'SELECT -bm25({self.table}, 10.0, 4.0, 1.0, 4.0) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s AND rowid = events_event.id',
+            (match,), output_field=FloatField(),
+        ))
+
+    def index_events(self, queryset):
+        ids_sql, params = queryset.values('id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({ids_sql})', params)
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, name, location, description, category) '
+                f'SELECT e.id, e.name, e.location, e.description, c.name '
+                f'FROM events_event e JOIN events_category c ON c.id = e.category_id '
+                f'WHERE e.id IN ({ids_sql})',
+                params,
+            )
+
+    def remove_events(self, event_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(pk,) for pk in event_ids])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, name, location, description, category) '
+                f'SELECT e.id, e.name, e.location, e.description, c.name '
+                f'FROM events_event e JOIN events_category c ON c.id = e.category_id'
+            )
+
+
+class PostgresSearchBackend(BasicSearchBackend):
+    table = 'events_event_search'
+
+    @property
+    def config(self):
+        return getattr(settings, 'EVENTS_SEARCH_CONFIG', 'english')
+
+    def document_sql(self):
+        return (
+            "setweight(to_tsvector(%(config)s::regconfig, coalesce(e.name, '')), 'A') || "
+            "setweight(to_tsvector(%(config)s::regconfig, coalesce(c.name, '')), 'B') || "
+            "setweight(to_tsvector(%(config)s::regconfig, coalesce(e.location, '')), 'B') || "
+            "setweight(to_tsvector(%(config)s::regconfig, coalesce(e.description, '')), 'C')"
+        ) % {'config': '%s'}
+
+    def filter(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return self.unranked(queryset)
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.filter(
+            id__in=RawSQL(
+                f'SELECT event_id FROM {self.table} WHERE document @@ to_tsquery(%s::regconfig, %s)',
+                (self.config, tsquery),
+            ),
+        ).annotate(search_rank=RawSQL(
+            f'SELECT ts_rank(document, to_tsquery(%s::regconfig, %s)) FROM {self.table} '
+            f'WHERE event_id = events_event.id',
+            (self.config, tsquery), output_field=FloatField(),
+        ))
+
+    def _upsert(self, where_sql='', params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (event_id, document) '
+                f'SELECT e.id, {self.document_sql()} '
+                f'FROM events_event e JOIN events_category c ON c.id = e.category_id {where_sql} '
+                f'ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document',
+                (self.config,) * 4 + tuple(params),
+            )
+
+    def index_events(self, queryset):
+        ids_sql, params = queryset.values('id').query.sql_with_params()
+        self._upsert(f'WHERE e.id IN ({ids_sql})', params)
+
+    def remove_events(self, event_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE event_id = ANY(%s)', (list(event_ids),))
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {self.table}')
+        self._upsert()
+
+
+_VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+@functools.lru_cache
+def _has_table(database, table):
+    return table in connection.introspection.table_names()
+
+
+def get_search_backend():
+    path = getattr(settings, 'EVENTS_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    backend = _VENDOR_BACKENDS.get(connection.vendor, BasicSearchBackend)
+    # The migration skips the FTS5 table on SQLite builds compiled without it
+    if backend is SQLiteFTSBackend and not _has_table(connection.settings_dict['NAME'], backend.table):
+        backend = BasicSearchBackend
+    return backend()
@@ -1,65 +1,125 @@
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.conf import settings
 from django.contrib.auth.models import User
-from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_encode
-from django.utils.encoding import force_bytes
-from django.urls import reverse
-from .models import Event
+from django.utils import timezone
+from . import catalog, mail, roles, stats
+from .search import get_search_backend
+from .models import Event, Category
 
 
 @receiver(post_save, sender=User)
 def send_activation_email(sender, instance, created, **kwargs):
-    """Send activation email when a new user is created"""
+    """Queue the activation email when a new inactive user is created"""
     if created and not instance.is_active:
-        # Generate activation token
-        token = default_token_generator.make_token(instance)
-        uid = urlsafe_base64_encode(force_bytes(instance.pk))
-
-        # Create activation link
-        activation_link = f"{settings.SITE_URL}{reverse('activate_account', kwargs={'uidb64': uid, 'token': token})}"
-
-        # Send activation email
-        try:
-            send_mail(
-                subject='Activate Your Account',
-                message=f'Hi {instance.get_full_name() or instance.username},\n\n'
-                       f'Thank you for registering! Please click the link below to activate your account:\n\n'
-                       f'{activation_link}\n\n'
-                       f'If you didn\'t create this account, please ignore this email.\n\n'
-                       f'Best regards,\nEvent Management Team',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[instance.email],
-                fail_silently=False,
-            )
-        except Exception as e:
-            print(f"Activation email sending failed: {e}")
+        mail.queue_activation_email(instance)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def reset_cached_roles(sender, instance, action, **kwargs):
+    """Drop the memoised group names when a user's membership changes"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if isinstance(instance, User):
+            roles.invalidate_group_names(instance)
+        # Role counts on the dashboards changed too
+        stats.invalidate()
 
 
 @receiver(m2m_changed, sender=Event.participants.through)
-def send_rsvp_notification(sender, instance, action, pk_set, **kwargs):
-    """Send email notification when a user RSVPs to an event"""
-    if action == 'post_add':
-        for user_id in pk_set:
-            try:
-                user = User.objects.get(pk=user_id)
-                send_mail(
-                    subject=f'RSVP Confirmation: {instance.name}',
-                    message=f'Hi {user.get_full_name() or user.username},\n\n'
-                           f'You have successfully RSVP\'d to the following event:\n\n'
-                           f'Event: {instance.name}\n'
-                           f'Date: {instance.date}\n'
-                           f'Time: {instance.time}\n'
-                           f'Location: {instance.location}\n\n'
-                           f'Thank you for your interest!\n\n'
-                           f'Best regards,\nEvent Management Team',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[user.email],
-                    fail_silently=False,
-                )
-            except User.DoesNotExist:
-                continue
-            except Exception as e:
-                print(f"RSVP notification email sending failed: {e}")
\ No newline at end of file
+def send_rsvp_notification(sender, instance, action, reverse, pk_set, **kwargs):
+    """Queue a confirmation email for every new RSVP"""
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        # user.events_participating_in.add(...): instance is the user
+        for event in Event.objects.filter(pk__in=pk_set):
+            mail.queue_rsvp_confirmations(event, [instance])
+    else:
+        mail.queue_rsvp_confirmations(instance, User.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=User)
+def invalidate_dashboard_stats(sender, **kwargs):
+    """Drop cached dashboard counters when the rows they count change"""
+    stats.invalidate()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog(sender, **kwargs):
+    """Drop cached event and category listings"""
+    catalog.invalidate(content=True)
+
+
+@receiver(post_save, sender=User)
+def invalidate_dashboard_stats_for_user(sender, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which no counter depends on
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    stats.invalidate()
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def sync_participant_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep Event.participant_count in step with participants.add/remove/clear"""
+    if reverse and action == 'pre_clear':
+        # user.events_participating_in.clear(): remember which events lose a seat
+        instance._cleared_event_ids = list(instance.events_participating_in.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        events = Event.objects.filter(pk=instance.pk)
+    elif action == 'post_clear':
+        events = Event.objects.filter(pk__in=getattr(instance, '_cleared_event_ids', []))
+    else:
+        events = Event.objects.filter(pk__in=pk_set)
+    # Recounting is exact even when remove() is passed ids that weren't attending
+    events.recount_participants()
+
+
+@receiver(pre_delete, sender=User)
+def remember_rsvps_of_deleted_user(sender, instance, **kwargs):
+    # The cascade removes the user's RSVP rows without an m2m_changed signal
+    instance._rsvp_event_ids = list(instance.events_participating_in.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=User)
+def recount_rsvps_of_deleted_user(sender, instance, **kwargs):
+    event_ids = getattr(instance, '_rsvp_event_ids', None)
+    if event_ids:
+        Event.objects.filter(pk__in=event_ids).recount_participants()
+        catalog.invalidate()
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def invalidate_dashboard_stats_for_rsvp(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        stats.invalidate()
+        # Listings show participant counts
+        catalog.invalidate()
+
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, **kwargs):
+    """Keep the full-text search index in sync with the event"""
+    get_search_backend().index_events(Event.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, **kwargs):
+    get_search_backend().remove_events([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_events(sender, instance, created, **kwargs):
+    # The category name is part of every event document and page in it
+    if not created:
+        events = Event.objects.filter(category_id=instance.pk)
+        events.update(updated_at=timezone.now())
+        get_search_backend().index_events(events)
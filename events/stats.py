@@ -0,0 +1,95 @@
+"""Aggregate counters shown on the participant, organizer and admin dashboards.
+
+Every function issues at most one query per table by using conditional
+aggregation (``Count(..., filter=Q(...))``) instead of one ``COUNT(*)`` per
+number.
+
+``cached_admin_stats`` and ``cached_organizer_stats`` serve the global
+counters from the ``stats`` cache namespace, which ``events.signals`` bumps
+whenever events, categories, users or RSVPs change.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Count, Q
+from django.utils.timezone import now
+
+from . import cache, roles
+from .models import Category, Event
+
+
+def event_stats(today=None):
+    today = today or now().date()
+    return Event.objects.aggregate(
+        total_events=Count('id'),
+        upcoming_events=Count('id', filter=Q(date__gt=today)),
+        past_events=Count('id', filter=Q(date__lt=today)),
+    )
+
+
+def user_stats():
+    # The groups join multiplies rows per membership, hence distinct counts
+    return User.objects.aggregate(
+        total_users=Count('id', distinct=True),
+        active_users=Count('id', distinct=True, filter=Q(is_active=True)),
+        inactive_users=Count('id', distinct=True, filter=Q(is_active=False)),
+        total_participants=Count('id', distinct=True, filter=Q(groups__name=roles.PARTICIPANT)),
+        total_organizers=Count('id', distinct=True, filter=Q(groups__name=roles.ORGANIZER)),
+        total_admins=Count('id', distinct=True, filter=Q(groups__name=roles.ADMIN)),
+    )
+
+
+def category_count():
+    return Category.objects.count()
+
+
+def rsvp_count():
+    """Total RSVPs across all events, counted on the participants through table"""
+    return Event.participants.through.objects.count()
+
+
+def dashboard_stats(today=None):
+    """Counters for the participant ``dashboard``"""
+    stats = event_stats(today)
+    stats['total_users'] = User.objects.count()
+    return stats
+
+
+def admin_stats(today=None):
+    """Counters for ``admin_dashboard``"""
+    return {
+        **event_stats(today),
+        **user_stats(),
+        'total_categories': category_count(),
+    }
+
+
+def organizer_stats(today=None):
+    """Counters for ``organizer_dashboard``"""
+    events = event_stats(today)
+    participants = User.objects.filter(groups__name=roles.PARTICIPANT).count()
+    return {
+        'my_events_count': events['total_events'],
+        'upcoming_events': events['upcoming_events'],
+        'past_events': events['past_events'],
+        'total_categories': category_count(),
+        'total_participants': participants,
+        'total_rsvps': rsvp_count(),
+    }
+
+
+def _cached(name, builder, today):
+    today = today or now().date()
+    timeout = getattr(settings, 'EVENTS_STATS_CACHE_TIMEOUT', 300)
+    return cache.get_or_set(cache.STATS, (name, today.isoformat()), lambda: builder(today), timeout)
+
+
+def cached_admin_stats(today=None):
+    return _cached('admin', admin_stats, today)
+
+
+def cached_organizer_stats(today=None):
+    return _cached('organizer', organizer_stats, today)
+
+
+def invalidate():
+    cache.bump_version(cache.STATS)
@@ -0,0 +1,78 @@
+"""Static files storage: Tailwind build, hashed names and precompressed copies.
+
+``collectstatic`` with this storage (see ``STORAGES`` in settings):
+
+1. rebuilds ``css/styles.css`` with the Tailwind CLI, which keeps only the
+   classes found in the ``content`` paths of ``tailwind.config.js``, and
+   hashes that build instead of the collected copy (skipped when
+   ``EVENTS_TAILWIND_BUILD`` is off or ``npm install`` has not been run; the
+   committed stylesheet is used then);
+2. writes content-hashed copies and ``staticfiles.json``;
+3. writes ``.gz`` and, with the ``Brotli`` package, ``.br`` copies.
+
+WhiteNoise serves the hashed names with a far-future ``immutable``
+Cache-Control header and picks the precompressed copy the browser accepts.
+"""
+import logging
+import subprocess
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+TAILWIND_INPUT = 'static/css/tailwind.css'
+TAILWIND_OUTPUT = 'css/styles.css'
+# Tailwind sources in STATICFILES_DIRS; their @import/@tailwind rules are not URLs
+BUILD_INPUTS = ('css/tailwind.css', 'src/styles.css')
+
+
+def tailwind_cli():
+    return settings.BASE_DIR / 'node_modules' / '.bin' / 'tailwindcss'
+
+
+def build_tailwind(output):
+    """Compile and purge the Tailwind stylesheet into ``output``; False if skipped"""
+    if not getattr(settings, 'EVENTS_TAILWIND_BUILD', True):
+        return False
+    cli = tailwind_cli()
+    if not cli.exists():
+        logger.warning('Tailwind CLI not found at %s; run "npm install". Keeping the committed %s', cli, TAILWIND_OUTPUT)
+        return False
+    subprocess.run(
+        [str(cli), '-c', 'tailwind.config.js', '-i', TAILWIND_INPUT, '-o', str(output), '--minify'],
+        cwd=settings.BASE_DIR, check=True, capture_output=True,
+    )
+    return True
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    # A file missing from the manifest (e.g. collectstatic not rerun after adding
+    # it) falls back to its unhashed name instead of failing the page
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        paths = {name: value for name, value in paths.items() if name not in BUILD_INPUTS}
+        if dry_run or TAILWIND_OUTPUT not in paths:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+        with tempfile.TemporaryDirectory() as build_dir:
+            build_name = Path(TAILWIND_OUTPUT).name
+            if build_tailwind(Path(build_dir) / build_name):
+                # Hashing reads each file from its source storage, so point it at the build
+                source = FileSystemStorage(build_dir)
+                paths[TAILWIND_OUTPUT] = (source, build_name)
+                self.delete(TAILWIND_OUTPUT)
+                with source.open(build_name) as fh:
+                    self._save(TAILWIND_OUTPUT, fh)
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected at all, e.g. in tests or before the first collectstatic
+            return name
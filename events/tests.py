@@ -1,3 +1,1073 @@
-from django.test import TestCase
+import json
+import logging
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail as django_mail
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from PIL import Image
+
+from . import catalog, exports, images, imports, mail, roles, rsvp, search, stats, views
+from .forms import EventForm
+from .models import Category, Event, OutboundEmail, UserProfile
+from .urls import urlpatterns
+
+
+timing_logger = logging.getLogger('events.timing')
+timing_handlers = []
+
+
+def setUpModule():
+    # Every test request is measured; keep the per-request log lines off the console
+    timing_handlers[:] = timing_logger.handlers
+    timing_logger.handlers = [logging.NullHandler()]
+
+
+def tearDownModule():
+    timing_logger.handlers = timing_handlers
+
+
+# Maximum number of SQL queries each named route may issue (cold cache,
+# logged in as a superuser). Session and auth lookups are included.
+QUERY_BUDGETS = {
+    'event_list': 6,
+    'dashboard': 7,
+    'admin_dashboard': 7,
+    'organizer_dashboard': 7,
+    'event_create': 4,
+    'event_export': 3,
+    'event_import': 2,
+    'event_detail': 6,
+    'event_attendees_export': 4,
+    'rsvp_event': 8,
+    'rsvp_api': 17,  # a batch of two operations
+    'event_update': 6,
+    'event_delete': 6,
+    'category_list': 3,
+    'category_create': 2,
+    'category_update': 3,
+    'category_delete': 5,
+    'user_list': 5,
+    'user_update_role': 5,
+    'user_bulk_roles': 3,
+    'group_list': 3,
+    'group_create': 2,
+    'group_members': 4,
+    'group_delete': 6,
+    'profile': 4,
+    'profile_edit': 4,
+    'password_change': 2,
+    'password_reset': 2,
+    'password_reset_confirm': 5,
+    'password_reset_done': 0,
+    'password_reset_complete': 0,
+    'signup': 2,
+    'activate_account': 2,
+    'login': 2,
+    'login_redirect': 2,
+    'logout': 4,
+}
+
+
+class QueryBudgetTests(TestCase):
+    """Every named route stays within its query budget, whatever the data size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in roles.SYSTEM_GROUPS:
+            Group.objects.get_or_create(name=name)
+        cls.admin = User.objects.create_superuser('budget-admin', 'admin@example.com', 'password')
+        UserProfile.objects.create(user=cls.admin)
+        cls.grown = 0
+
+    def setUp(self):
+        self.grow(3)
+
+    def grow(self, count):
+        """Add ``count`` categories, events, users and groups, each event with RSVPs"""
+        participant_group = Group.objects.get(name=roles.PARTICIPANT)
+        today = timezone.now().date()
+        start = self.grown
+        self.grown += count
+        users = [
+            User.objects.create_user(f'budget-user-{i}', f'user{i}@example.com', 'password')
+            for i in range(start, self.grown)
+        ]
+        participant_group.user_set.add(*users)
+        for i in range(start, self.grown):
+            category = Category.objects.create(name=f'Category {i}', description='Budget category')
+            Group.objects.create(name=f'Group {i}')
+            for offset in (-1, 0, 1):
+                event = Event.objects.create(
+                    name=f'Event {i} {offset}',
+                    description='Budget event',
+                    date=today + timedelta(days=offset),
+                    time='10:00',
+                    location='Dhaka',
+                    category=category,
+                )
+                event.participants.add(self.admin, *users)
+
+    def request_for(self, name):
+        """Return ``(method, url, data)`` exercising the route ``name``"""
+        event = Event.objects.order_by('id').first()
+        category = Category.objects.order_by('id').first()
+        user = User.objects.exclude(pk=self.admin.pk).order_by('id').first()
+        uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
+        token = default_token_generator.make_token(user)
+
+        def throwaway_event():
+            return Event.objects.create(
+                name='Throwaway', description='-', date=timezone.now().date(),
+                time='09:00', location='-', category=category,
+            )
+
+        requests = {
+            'event_list': lambda: ('get', reverse(name), None),
+            'dashboard': lambda: ('get', reverse(name), None),
+            'admin_dashboard': lambda: ('get', reverse(name), None),
+            'organizer_dashboard': lambda: ('get', reverse(name), None),
+            'event_create': lambda: ('get', reverse(name), None),
+            'event_export': lambda: ('get', reverse(name), None),
+            'event_import': lambda: ('get', reverse(name), None),
+            'event_detail': lambda: ('get', reverse(name, args=[event.pk]), None),
+            'event_attendees_export': lambda: ('get', reverse(name, args=[event.pk]), {'format': 'jsonl'}),
+            'rsvp_event': lambda: (
+                event.participants.add(self.admin),
+                ('post', reverse(name, args=[event.pk]), {'action': 'cancel_rsvp'}),
+            )[1],
+            'rsvp_api': lambda: ('post', reverse(name), {'operations': [
+                {'action': 'rsvp', 'event': event.pk}, {'action': 'cancel_rsvp', 'event': event.pk},
+            ]}),
+            'event_update': lambda: ('get', reverse(name, args=[event.pk]), None),
+            'event_delete': lambda: ('post', reverse(name, args=[throwaway_event().pk]), None),
+            'category_list': lambda: ('get', reverse(name), None),
+            'category_create': lambda: ('get', reverse(name), None),
+            'category_update': lambda: ('get', reverse(name, args=[category.pk]), None),
+            'category_delete': lambda: ('get', reverse(name, args=[
+                Category.objects.create(name='Throwaway', description='-').pk
+            ]), None),
+            'user_list': lambda: ('get', reverse(name), None),
+            'user_update_role': lambda: ('get', reverse(name, args=[user.pk]), None),
+            'user_bulk_roles': lambda: ('get', reverse(name), None),
+            'group_list': lambda: ('get', reverse(name), None),
+            'group_create': lambda: ('get', reverse(name), None),
+            'group_members': lambda: ('get', reverse(name, args=[
+                Group.objects.get(name=roles.PARTICIPANT).pk
+            ]), None),
+            'group_delete': lambda: ('get', reverse(name, args=[
+                Group.objects.create(name=f'Throwaway {Group.objects.count()}').pk
+            ]), None),
+            'profile': lambda: ('get', reverse(name), None),
+            'profile_edit': lambda: ('get', reverse(name), None),
+            'password_change': lambda: ('get', reverse(name), None),
+            'password_reset': lambda: ('get', reverse(name), None),
+            'password_reset_confirm': lambda: ('get', reverse(name, args=[uidb64, token]), None),
+            'password_reset_done': lambda: ('get', reverse(name), None),
+            'password_reset_complete': lambda: ('get', reverse(name), None),
+            'signup': lambda: ('get', reverse(name), None),
+            'activate_account': lambda: ('get', reverse(name, args=[uidb64, token]), None),
+            'login': lambda: ('get', reverse(name), None),
+            'login_redirect': lambda: ('get', reverse(name), None),
+            'logout': lambda: ('post', reverse(name), None),
+        }
+        return requests[name]()
+
+    def count_queries(self, name):
+        method, url, data = self.request_for(name)
+        # JSON endpoints take their dict payload as the request body
+        kwargs = {'content_type': 'application/json'} if name.endswith('_api') else {}
+        self.client.force_login(self.admin)
+        # Measure the uncached path; cached stats would hide regressions
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, **kwargs)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, f'{name} returned {response.status_code}')
+        return len(ctx)
+
+    def test_every_named_route_has_a_budget(self):
+        names = {pattern.name for pattern in urlpatterns if pattern.name}
+        self.assertEqual(names - QUERY_BUDGETS.keys(), set())
+
+    def test_routes_stay_within_query_budget(self):
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(route=name):
+                self.assertLessEqual(self.count_queries(name), budget)
+
+    def test_query_count_does_not_scale_with_data(self):
+        small = {name: self.count_queries(name) for name in QUERY_BUDGETS}
+        self.grow(12)
+        for name in QUERY_BUDGETS:
+            with self.subTest(route=name):
+                self.assertEqual(self.count_queries(name), small[name])
+
+
+class RSVPTests(TestCase):
+    """RSVPs keep ``Event.participant_count`` exact and respect capacity"""
+
+    @classmethod
+    def setUpTestData(cls):
+        participant_group, _ = Group.objects.get_or_create(name=roles.PARTICIPANT)
+        cls.users = [User.objects.create_user(f'rsvp-{i}', f'rsvp{i}@example.com', 'password') for i in range(3)]
+        participant_group.user_set.add(*cls.users)
+        category = Category.objects.create(name='Counted', description='-')
+        cls.event = Event.objects.create(
+            name='Small room', description='-', date=timezone.now().date(),
+            time='10:00', location='-', category=category, capacity=2,
+        )
+
+    def refresh(self):
+        self.event.refresh_from_db(fields=['participant_count'])
+        return self.event.participant_count
+
+    def test_m2m_changes_keep_the_counter_in_sync(self):
+        self.event.participants.add(*self.users[:2])
+        self.assertEqual(self.refresh(), 2)
+        self.event.participants.remove(self.users[0])
+        self.assertEqual(self.refresh(), 1)
+        self.users[1].events_participating_in.clear()
+        self.assertEqual(self.refresh(), 0)
+        self.event.participants.add(*self.users)
+        self.users[2].delete()
+        self.assertEqual(self.refresh(), 2)
+
+    def test_dashboard_lists_rsvps_through_the_participants_table(self):
+        Event.objects.create(
+            name='Other room', description='-', date=self.event.date, time='11:00',
+            location='-', category=self.event.category,
+        )
+        self.event.participants.add(self.users[0])
+        self.client.force_login(self.users[0])
+        with CaptureQueriesContext(connection) as queries:
+            events = list(self.client.get(reverse('dashboard')).context['events'])
+        self.assertEqual([(e.name, e.user_is_attending) for e in events], [('Small room', True)])
+        # Driven by the (user_id, event_id) index, not a scan of every event
+        self.assertTrue(any(
+            'INNER JOIN "events_event_participants"' in q['sql'] and 'user_is_attending' in q['sql']
+            for q in queries
+        ))
+
+    def test_rsvp_stops_at_capacity(self):
+        url = reverse('rsvp_event', args=[self.event.pk])
+        for user in self.users:
+            self.client.force_login(user)
+            self.client.post(url, {'action': 'rsvp'})
+        self.assertEqual(self.refresh(), 2)
+        self.assertEqual(self.event.participants.count(), 2)
+        self.assertFalse(self.event.participants.filter(pk=self.users[2].pk).exists())
+
+        self.client.post(url, {'action': 'cancel_rsvp'})
+        self.assertEqual(self.refresh(), 2)
+        self.client.force_login(self.users[0])
+        self.client.post(url, {'action': 'cancel_rsvp'})
+        self.assertEqual(self.refresh(), 1)
+
+    def test_recount_command_fixes_drift(self):
+        self.event.participants.add(*self.users[:2])
+        Event.objects.filter(pk=self.event.pk).update(participant_count=7)
+        call_command('recount_participants', stdout=StringIO())
+        self.assertEqual(self.refresh(), 2)
+
+    def test_event_detail_pages_attendees(self):
+        self.event.participants.add(*self.users)
+        self.client.force_login(self.users[0])
+        url = reverse('event_detail', args=[self.event.pk])
+        with mock.patch('events.views.ATTENDEES_PAGE_SIZE', 2):
+            response = self.client.get(url)
+            self.assertEqual([u.username for u in response.context['attendees']], ['rsvp-0', 'rsvp-1'])
+            self.assertTrue(response.context['event'].user_is_attending)
+            self.assertNotContains(response, 'rsvp0@example.com')
+            response = self.client.get(url, {'cursor': response.context['attendee_page'].next_cursor})
+            self.assertEqual([u.username for u in response.context['attendees']], ['rsvp-2'])
+
+    def test_rsvp_service_is_idempotent(self):
+        user = self.users[0]
+        self.assertEqual(rsvp.rsvp(self.event, user).status, rsvp.ATTENDING)
+        self.assertEqual(rsvp.rsvp(self.event, user).status, rsvp.ALREADY_ATTENDING)
+        # Lose the race: the existence check misses a row inserted concurrently
+        with mock.patch.object(rsvp, 'is_attending', return_value=False):
+            self.assertEqual(rsvp.rsvp(self.event, user).status, rsvp.ALREADY_ATTENDING)
+        self.assertEqual(self.refresh(), 1)
+        self.assertEqual(rsvp.cancel(self.event, user).status, rsvp.CANCELLED)
+        self.assertEqual(rsvp.cancel(self.event, user).status, rsvp.NOT_ATTENDING)
+        self.assertEqual(self.refresh(), 0)
+
+    def post_api(self, payload):
+        return self.client.post(reverse('rsvp_api'), payload, content_type='application/json')
+
+    def test_rsvp_api_batch(self):
+        self.client.force_login(self.users[0])
+        response = self.post_api({'operations': [
+            {'action': 'rsvp', 'event': self.event.pk},
+            {'action': 'rsvp', 'event': self.event.pk},
+            {'action': 'rsvp', 'event': 0},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [
+            {'event': self.event.pk, 'status': rsvp.ATTENDING, 'attending': True, 'participant_count': 1},
+            {'event': self.event.pk, 'status': rsvp.ALREADY_ATTENDING, 'attending': True, 'participant_count': 1},
+            {'event': 0, 'status': 'not_found'},
+        ])
+        response = self.post_api({'action': 'cancel_rsvp', 'event': self.event.pk})
+        self.assertEqual(response.json()['results'][0]['status'], rsvp.CANCELLED)
+
+    @override_settings(EVENTS_RSVP_BATCH_LIMIT=2)
+    def test_rsvp_api_rejects_bad_requests(self):
+        self.assertEqual(self.post_api({'action': 'rsvp', 'event': self.event.pk}).status_code, 401)
+        outsider = User.objects.create_user('outsider', 'outsider@example.com', 'password')
+        self.client.force_login(outsider)
+        self.assertEqual(self.post_api({'action': 'rsvp', 'event': self.event.pk}).status_code, 403)
+        self.client.force_login(self.users[0])
+        self.assertEqual(self.post_api({'action': 'join', 'event': self.event.pk}).status_code, 400)
+        self.assertEqual(self.post_api({'operations': [{'action': 'rsvp', 'event': self.event.pk}] * 3}).status_code, 400)
+        self.assertEqual(self.refresh(), 0)
+
+    def test_attendee_export_streams_profile_phone(self):
+        UserProfile.objects.create(user=self.users[0], phone_number='+8801712345678')
+        User.objects.filter(pk=self.users[1].pk).update(first_name='=HYPERLINK("http://x")', last_name='-2+3+cmd|x')
+        self.event.participants.add(*self.users[:2])
+        organizer = User.objects.create_superuser('exporter', 'exporter@example.com', 'password')
+        self.client.force_login(organizer)
+        response = self.client.get(reverse('event_attendees_export', args=[self.event.pk]))
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'username,email,first_name,last_name,phone_number')
+        # Formula-like cells are quoted so spreadsheets show them as text; numbers are not
+        self.assertEqual(lines[1:], [
+            'rsvp-0,rsvp0@example.com,,,+8801712345678',
+            'rsvp-1,rsvp1@example.com,"\'=HYPERLINK(""http://x"")",\'-2+3+cmd|x,',
+        ])
+        response = self.client.get(reverse('event_attendees_export', args=[self.event.pk]), {'format': 'jsonl'})
+        self.assertIn('"first_name": "=HYPERLINK', b''.join(response.streaming_content).decode())
+        self.assertEqual(
+            [exports._csv_cell(value) for value in ('-', '-12.5', '+1 (555) 010-9999', '@SUM(A1)', '\t1')],
+            ['-', '-12.5', '+1 (555) 010-9999', "'@SUM(A1)", "'\t1"],
+        )
+
+
+class StatsCacheTests(TestCase):
+    """Dashboard counters are cached until the rows they count change"""
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Music')
+        self.admin = User.objects.create_superuser('boss', 'boss@example.com', 'password')
+
+    def test_second_dashboard_hit_skips_stats_queries(self):
+        self.client.force_login(self.admin)
+        self.client.get(reverse('admin_dashboard'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin_dashboard'))
+        self.assertEqual(response.context['total_categories'], 1)
+        self.assertFalse([q['sql'] for q in queries if 'COUNT(' in q['sql']])
+
+    def test_changes_refresh_counters(self):
+        self.assertEqual(stats.cached_admin_stats()['total_events'], 0)
+        with self.assertNumQueries(0):
+            stats.cached_admin_stats()
+        event = Event.objects.create(
+            name='Jazz night', description='-', date=timezone.localdate(), time='18:00',
+            location='Dhaka', category=self.category,
+        )
+        self.assertEqual(stats.cached_admin_stats()['total_events'], 1)
+
+        user = User.objects.create_user('fan', 'fan@example.com', 'password')
+        self.assertEqual(stats.cached_admin_stats()['total_users'], 2)
+        self.assertEqual(stats.cached_organizer_stats()['total_rsvps'], 0)
+        event.participants.add(user)
+        self.assertEqual(stats.cached_organizer_stats()['total_rsvps'], 1)
+
+        self.assertEqual(stats.cached_admin_stats()['total_organizers'], 0)
+        Group.objects.create(name=roles.ORGANIZER).user_set.add(user)
+        self.assertEqual(stats.cached_admin_stats()['total_organizers'], 1)
+
+        user.delete()
+        self.assertEqual(stats.cached_admin_stats()['total_users'], 1)
+        self.assertEqual(stats.cached_organizer_stats()['total_rsvps'], 0)
+
+
+class FlakyBackend(LocmemBackend):
+    """Locmem backend with an SMTP-like connection that drops on the first send"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connection = None
+        self.opened = 0
+        self.drop_next = True
+
+    def open(self):
+        if self.connection is None:
+            self.connection = 'live'
+            self.opened += 1
+
+    def close(self):
+        self.connection = None
+
+    def send_messages(self, messages):
+        if self.drop_next:
+            self.drop_next = False
+            self.connection = 'dead'
+        if self.connection == 'dead':
+            raise ConnectionError('server disconnected')
+        return super().send_messages(messages)
+
+
+class OutboxTests(TestCase):
+    """Requests only queue mail; send_queued delivers, retries and gives up"""
+
+    def setUp(self):
+        self.event = Event.objects.create(
+            name='Jazz night', description='-', date=timezone.localdate(), time='18:00',
+            location='Dhaka', category=Category.objects.create(name='Music'),
+        )
+
+    def queue(self, count):
+        start = User.objects.count()
+        for i in range(start, start + count):
+            rsvp.rsvp(self.event, User.objects.create_user(f'fan{i}', f'fan{i}@example.com', 'password'))
+
+    def test_rsvp_and_signup_only_queue_mail(self):
+        self.queue(1)
+        self.assertEqual(OutboundEmail.objects.filter(subject__startswith='RSVP Confirmation').count(), 1)
+
+        self.client.post(reverse('signup'), {
+            'username': 'newcomer', 'email': 'newcomer@example.com',
+            'password1': 'Tr0ub4dor&3xyz', 'password2': 'Tr0ub4dor&3xyz',
+        })
+        self.assertTrue(OutboundEmail.objects.filter(to=['newcomer@example.com'], subject='Activate Your Account').exists())
+        self.assertEqual(django_mail.outbox, [])
+
+        self.assertEqual(mail.send_queued(), (2, 0))
+        self.assertEqual(len(django_mail.outbox), 2)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+        self.assertEqual(mail.send_queued(), (0, 0))
+
+    def test_failures_back_off_then_give_up(self):
+        self.queue(1)
+        with mock.patch.object(LocmemBackend, 'send_messages', side_effect=ConnectionError('refused')):
+            before = timezone.now()
+            self.assertEqual(mail.send_queued(max_attempts=2, backoff=60), (0, 1))
+            email = OutboundEmail.objects.get()
+            self.assertEqual((email.status, email.attempts, email.last_error), (OutboundEmail.STATUS_PENDING, 1, 'refused'))
+            self.assertGreaterEqual(email.next_attempt_at, before + timedelta(seconds=60))
+            # Not due yet
+            self.assertEqual(mail.send_queued(max_attempts=2, backoff=60), (0, 0))
+
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(mail.send_queued(max_attempts=2, backoff=60), (0, 1))
+            self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.STATUS_FAILED)
+
+    def test_messages_are_sent_outside_a_transaction(self):
+        self.queue(2)
+        seen = []
+        # TestCase wraps each test in atomic blocks of its own
+        depth = len(connection.atomic_blocks)
+
+        def record(backend, messages):
+            seen.append((len(connection.atomic_blocks) > depth, sorted(OutboundEmail.objects.values_list('status', flat=True))))
+            return len(messages)
+
+        with mock.patch.object(LocmemBackend, 'send_messages', record):
+            self.assertEqual(mail.send_queued(), (2, 0))
+        self.assertEqual(seen, [(False, ['sending', 'sending']), (False, ['sending', 'sent'])])
+
+        # A worker that died mid-batch leaves rows in "sending" until the claim times out
+        self.queue(1)
+        mail.claim()
+        self.assertEqual(mail.send_queued(), (0, 0))
+        OutboundEmail.objects.filter(status=OutboundEmail.STATUS_SENDING).update(
+            claimed_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(mail.send_queued(), (1, 0))
+
+    def test_dropped_connection_is_reopened(self):
+        self.queue(5)
+        connection = FlakyBackend()
+        self.assertEqual(mail.send_queued(connection=connection), (4, 1))
+        self.assertEqual(connection.opened, 2)
+        self.assertEqual(len(django_mail.outbox), 4)
+
+
+class SearchTests(TestCase):
+    """Each backend matches prefixes and follows event and category changes"""
+
+    def setUp(self):
+        self.category = Category.objects.create(name='Music', description='-')
+        self.event = Event.objects.create(
+            name='Jazz conference', description='Evening sets', date=timezone.localdate(),
+            time='18:00', location='Dhaka', category=self.category,
+        )
+
+    def found(self, query):
+        return list(search.get_search_backend().filter(Event.objects.all(), query).values_list('name', flat=True))
+
+    def check_backend(self):
+        self.assertEqual(self.found('conf dha'), ['Jazz conference'])
+        self.assertEqual(self.found('opera'), [])
+
+        self.category.name = 'Orchestra'
+        self.category.save()
+        self.assertEqual(self.found('orch'), ['Jazz conference'])
+        self.assertEqual(self.found('music'), [])
+
+        # No word characters: nothing to match on, so nothing is filtered out
+        self.assertEqual(self.found('!'), ['Jazz conference'])
+
+        self.event.delete()
+        self.assertEqual(self.found('jazz'), [])
+
+    def test_sqlite_fts_backend(self):
+        self.assertIsInstance(search.get_search_backend(), search.SQLiteFTSBackend)
+        self.check_backend()
+
+    @override_settings(EVENTS_SEARCH_BACKEND='events.search.BasicSearchBackend')
+    def test_basic_backend(self):
+        self.check_backend()
+
+    def test_falls_back_without_fts_table(self):
+        search._has_table.cache_clear()
+        self.addCleanup(search._has_table.cache_clear)
+        with mock.patch.object(connection.introspection, 'table_names', return_value=[]):
+            self.assertIs(type(search.get_search_backend()), search.BasicSearchBackend)
+
+    def test_symbol_only_search_is_no_search(self):
+        with mock.patch.object(views, 'get_search_backend') as backend:
+            for query in ('!', '-', '"'):
+                self.assertContains(self.client.get(reverse('event_list'), {'search': query}), 'Jazz conference')
+        backend.assert_not_called()
+
+    def test_rebuild_search_index_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.SQLiteFTSBackend.table}')
+        self.assertEqual(self.found('jazz'), [])
+
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Rebuilt search index with SQLiteFTSBackend', out.getvalue())
+        self.assertEqual(self.found('jazz'), ['Jazz conference'])
+
+
+class ImportTests(TestCase):
+    """Bulk imports validate every row and create missing categories once"""
+
+    CSV = (
+        'name,description,date,time,location,category,capacity\n'
+        'Opening,Kick-off,2026-01-10,09:00,Dhaka,Music,\n'
+        'Closing,Wrap-up,2026-01-12,18:30,Dhaka,Music,50\n'
+        'Broken,-,not-a-date,09:00,Dhaka,Music,\n'
+        'Talk,-,2026-01-11,10:00,Khulna,Tech,-3\n'
+        'Workshop,Hands on,2026-01-11,13:00,Khulna,Tech,\n'
+    )
+
+    def test_import_reports_rows_and_inserts_in_batches(self):
+        Category.objects.create(name='Music', description='Existing')
+        result = imports.import_events(StringIO(self.CSV), 'csv', batch_size=2)
+        self.assertEqual(result.created, 3)
+        self.assertEqual(result.categories_created, 1)
+        self.assertEqual([line for line, _ in result.errors], [4, 5])
+        self.assertIn('date:', result.errors[0][1])
+        self.assertEqual(Category.objects.filter(name='Music').count(), 1)
+        self.assertEqual(Event.objects.get(name='Closing').capacity, 50)
+        self.assertEqual(Event.objects.get(name='Workshop').category.name, 'Tech')
+
+    def test_upload_view_dry_run_writes_nothing(self):
+        organizer = User.objects.create_superuser('importer', 'importer@example.com', 'password')
+        self.client.force_login(organizer)
+        upload = SimpleUploadedFile('season.jsonl', (
+            '{"name": "Opening", "description": "-", "date": "2026-01-10", "time": "09:00",'
+            ' "location": "Dhaka", "category": "Music"}\n'
+            'not json\n'
+        ).encode())
+        response = self.client.post(reverse('event_import'), {'file': upload, 'dry_run': 'on'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.context['result'].created, response.context['result'].failed), (1, 1))
+        self.assertFalse(Event.objects.exists())
+        self.assertFalse(Category.objects.exists())
+
+    def test_bad_values_and_encodings_are_reported(self):
+        result = imports.import_events(StringIO(
+            '{"name": "Opening", "description": "-", "date": 20260110, "time": "09:00",'
+            ' "location": "Dhaka", "category": "Music", "capacity": 40}\n'
+            '{"name": ["x"], "description": "-", "date": "2026-01-10", "time": "09:00",'
+            ' "location": "Dhaka", "category": "Music"}\n'
+            '{"name": "Closing", "description": "-", "date": "2026-01-12", "time": "18:00",'
+            ' "location": "Dhaka", "category": "Music", "capacity": 40}\n'
+        ), 'jsonl')
+        self.assertEqual(result.created, 1)
+        self.assertEqual(Event.objects.get().capacity, 40)
+        self.assertEqual(result.errors, [(1, 'date: Enter a valid date.'), (2, 'name: Enter a valid value.')])
+
+        self.client.force_login(User.objects.create_superuser('importer', 'importer@example.com', 'password'))
+        upload = SimpleUploadedFile('latin.csv', 'name,location\nCaf\xe9,Dhaka\n'.encode('latin-1'))
+        response = self.client.post(reverse('event_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context['form'], 'file', 'The file must be UTF-8 encoded.')
+
+
+class UserListTests(TestCase):
+    """The user list filters server-side and pages by cursor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('list-admin', 'admin@example.com', 'password')
+        cls.organizers = Group.objects.create(name=roles.ORGANIZER)
+        for i in range(5):
+            user = User.objects.create_user(f'member-{i}', f'member{i}@example.com', 'password', is_active=i != 4)
+            if i % 2:
+                user.groups.add(cls.organizers)
+
+    def usernames(self, **params):
+        response = self.client.get(reverse('user_list'), params)
+        return [user.username for user in response.context['users']], response.context['page_obj']
+
+    def test_filters(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.usernames(group=self.organizers.pk)[0], ['member-3', 'member-1'])
+        self.assertEqual(self.usernames(active='0')[0], ['member-4'])
+        self.assertEqual(self.usernames(q='MEMBER2')[0], ['member-2'])
+        self.assertEqual(self.usernames(q='list')[0], ['list-admin'])
+
+    def test_cursor_pages(self):
+        self.client.force_login(self.admin)
+        with mock.patch('events.views.USER_LIST_PAGE_SIZE', 4):
+            first, page = self.usernames()
+            second, _ = self.usernames(cursor=page.next_cursor)
+        self.assertEqual(first, ['member-4', 'member-3', 'member-2', 'member-1'])
+        self.assertEqual(second, ['member-0', 'list-admin'])
+
+    def test_bulk_roles_apply_set_differences(self):
+        participants = Group.objects.create(name=roles.PARTICIPANT)
+        identifiers = ['member-0', 'member1@example.com', 'member-2', 'nobody']
+        user_ids, unmatched = roles.find_user_ids(identifiers)
+        self.assertEqual(unmatched, {'nobody'})
+
+        change = roles.change_roles(user_ids, [roles.ORGANIZER], roles.GRANT)
+        self.assertEqual((change.users, change.added, change.removed), (3, 2, 0))
+        self.assertEqual(roles.change_roles(user_ids, [roles.ORGANIZER]).added, 0)
+
+        change = roles.change_roles(user_ids, [roles.PARTICIPANT], roles.REPLACE)
+        self.assertEqual((change.added, change.removed), (3, 3))
+        self.assertEqual(set(participants.user_set.values_list('id', flat=True)), user_ids)
+        self.assertEqual(self.organizers.user_set.count(), 1)
+
+        self.assertEqual(roles.change_roles(user_ids, [roles.PARTICIPANT], roles.REVOKE).removed, 3)
+        with self.assertRaises(ValueError):
+            roles.change_roles(user_ids, ['Typo'])
+
+    def test_group_list_counts_members(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('group_list'))
+        self.assertEqual([(g.name, g.member_count) for g in response.context['groups']], [(roles.ORGANIZER, 2)])
+        response = self.client.get(reverse('group_members', args=[self.organizers.pk]))
+        self.assertEqual([u.username for u in response.context['members']], ['member-1', 'member-3'])
+
+
+class EventListPaginationTests(TestCase):
+    """The event list pages by cursor in keyset mode"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Music')
+        today = timezone.localdate()
+        for i in range(25):
+            Event.objects.create(
+                name=f'Event {i:02}', description='-', date=today + timedelta(days=i),
+                time='18:00', location='Dhaka', category=category,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def names(self, response):
+        return [event.name for event in response.context['events']]
+
+    @override_settings(EVENTS_LIST_PAGINATION='keyset')
+    def test_cursor_pages(self):
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(reverse('event_list'))
+        self.assertTrue(first.context['keyset_pagination'])
+        self.assertEqual(self.names(first), [f'Event {i:02}' for i in range(20)])
+        self.assertFalse([q['sql'] for q in queries if 'COUNT(' in q['sql'] or 'OFFSET' in q['sql']])
+
+        second = self.client.get(reverse('event_list'), {'cursor': first.context['page_obj'].next_cursor})
+        self.assertEqual(self.names(second), [f'Event {i:02}' for i in range(20, 25)])
+        self.assertFalse(second.context['page_obj'].has_next())
+
+        for cursor in ('garbage', first.context['page_obj'].next_cursor[:-2] + 'xx'):
+            self.assertEqual(self.client.get(reverse('event_list'), {'cursor': cursor}).status_code, 404)
+
+    def test_empty_cursor_shares_the_offset_page_cache_entry(self):
+        empty = self.client.get(reverse('event_list'), {'cursor': ''})
+        self.assertFalse(empty.context['keyset_pagination'])
+        with self.assertNumQueries(0):
+            plain = self.client.get(reverse('event_list'))
+        self.assertEqual(plain.content, empty.content)
+        self.assertContains(plain, 'Page 1 of 2')
+
+        with override_settings(EVENTS_LIST_PAGINATION='keyset'):
+            cache.clear()
+            cursor = self.client.get(reverse('event_list')).context['page_obj'].next_cursor
+        keyset = self.client.get(reverse('event_list'), {'cursor': cursor})
+        self.assertTrue(keyset.context['keyset_pagination'])
+        self.assertNotContains(keyset, 'Page 1 of 2')
+
+
+class CatalogCacheTests(TestCase):
+    """Anonymous listings come from the cache until the catalog changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Music', description='-')
+        cls.event = Event.objects.create(
+            name='Concert', description='-', date=timezone.now().date(),
+            time='20:00', location='Dhaka', category=cls.category,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_pages_are_served_without_queries(self):
+        for url in (reverse('event_list'), reverse('category_list')):
+            with self.subTest(url=url):
+                first = self.client.get(url, {'search': ' concert ', 'utm_source': 'mail'})
+                with self.assertNumQueries(0):
+                    second = self.client.get(url, {'search': 'concert'})
+                self.assertEqual(first.content, second.content)
+                self.assertIn('Cookie', second['Vary'])
+
+    def test_changes_invalidate_cached_pages(self):
+        url = reverse('event_list')
+        self.client.get(url)
+        self.event.name = 'Renamed concert'
+        self.event.save()
+        self.assertContains(self.client.get(url), 'Renamed concert')
+
+        user = User.objects.create_user('listener', 'listener@example.com', 'password')
+        self.event.participants.add(user)
+        self.assertContains(self.client.get(url), '<span class="font-semibold">1</span>', html=False)
+
+    def test_rsvps_leave_card_fragments_cached(self):
+        user = User.objects.create_user('member', 'member@example.com', 'password')
+        self.client.force_login(user)
+        self.client.get(reverse('event_list'))
+
+        def card_is_cached():
+            key = make_template_fragment_key('event_card', [self.event.pk, catalog.content_version()])
+            return cache.get(key) is not None
+
+        self.assertTrue(card_is_cached())
+        fragment = cache.get(make_template_fragment_key('event_card', [self.event.pk, catalog.content_version()]))
+        self.assertEqual(fragment.count('<div'), fragment.count('</div>'))
+        rsvp.rsvp(self.event, user)
+        self.assertContains(self.client.get(reverse('event_list')), "RSVP'd")
+        self.assertTrue(card_is_cached())
+        self.event.save()
+        self.assertFalse(card_is_cached())
+
+    def test_authenticated_users_are_not_served_cached_pages(self):
+        url = reverse('event_list')
+        self.client.get(url)
+        user = User.objects.create_user('member', 'member@example.com', 'password')
+        self.client.force_login(user)
+        self.assertContains(self.client.get(url), 'Logout')
+
+    def test_conditional_get_returns_not_modified(self):
+        url = reverse('event_list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+        self.category.name = 'Live music'
+        self.category.save()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+        url = reverse('event_detail', args=[self.event.pk])
+        response = self.client.get(url)
+        etag, modified = response['ETag'], response['Last-Modified']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+        self.assertEqual(self.client.get(url, headers={'if-modified-since': modified}).status_code, 304)
+
+        user = User.objects.create_user('fan', 'fan@example.com', 'password')
+        Group.objects.create(name=roles.PARTICIPANT).user_set.add(user)
+        rsvp.rsvp(self.event, user)
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+        # Another viewer's page differs, so the anonymous validator must not match
+        self.client.force_login(user)
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+
+
+class ImageTests(TestCase):
+    """Uploads lose their metadata and pages get resized variants"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+
+    def jpeg(self, size=(400, 200), **options):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, format='JPEG', **options)
+        return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_sanitize_strips_exif_and_applies_rotation(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # orientation: rotate 90 degrees
+        exif[0x010F] = 'Camera maker'
+        clean = images.sanitize(self.jpeg(exif=exif.tobytes()))
+        with Image.open(clean) as image:
+            self.assertEqual(image.size, (200, 400))
+            self.assertFalse(image.getexif())
+        with self.assertRaises(images.ValidationError):
+            images.sanitize(self.jpeg(size=(20, 20)))
+
+    def test_missing_original_is_not_retried_on_every_render(self):
+        event = Event(name='Default image', image='events/missing.jpg')
+        with mock.patch.object(images, 'render_variant', wraps=images.render_variant) as render:
+            self.assertEqual(event.card_image_url, event.image.url)
+            self.assertEqual(event.card_image_url, event.image.url)
+        self.assertEqual(render.call_count, 1)
+
+    def test_readable_but_unwritable_formats_are_rejected(self):
+        xpm = (
+            '/* XPM */\nstatic char *x[] = {\n"100 100 1 1",\n"  c #FF0000",\n'
+            + ''.join(f'"{" " * 100}",\n' for _ in range(100)) + '};\n'
+        ).encode()
+        with Image.open(BytesIO(xpm)) as image:
+            self.assertEqual(image.format, 'XPM')
+        form = EventForm(files={'image': SimpleUploadedFile('logo.xpm', xpm, content_type='image/x-xpixmap')})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['image'], ['Upload a JPEG, PNG, GIF or WebP image.'])
+
+    def test_sanitize_strips_multi_frame_images(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera maker'
+        frames = [Image.new('RGB', (100, 100), color) for color in ('red', 'blue')]
+        for fmt, options in (('MPO', {}), ('GIF', {'comment': b'secret', 'duration': 100, 'loop': 0})):
+            with self.subTest(fmt=fmt):
+                buffer = BytesIO()
+                frames[0].save(buffer, format=fmt, save_all=True, append_images=frames[1:], exif=exif.tobytes(), **options)
+                clean = images.sanitize(SimpleUploadedFile(f'photo.{fmt.lower()}', buffer.getvalue()))
+                with Image.open(clean) as image:
+                    self.assertFalse(image.getexif())
+                    self.assertNotIn('comment', image.info)
+                    self.assertEqual(getattr(image, 'n_frames', 1), 1 if fmt == 'MPO' else 2)
+
+    def test_variant_is_generated_once_at_the_variant_size(self):
+        event = Event.objects.create(
+            name='Gallery', description='-', date=timezone.localdate(), time='18:00',
+            location='Dhaka', category=Category.objects.create(name='Art'), image=self.jpeg((1600, 1200)),
+        )
+        url = event.card_image_webp_url
+        self.assertTrue(url.endswith('.webp'))
+        name = images.variant_name(event.image.name, 'card', 'webp')
+        with event.image.storage.open(name) as fh, Image.open(fh) as image:
+            self.assertEqual(image.size, images.VARIANTS['card'])
+        with mock.patch.object(event.image.storage, 'exists') as exists:
+            self.assertEqual(event.card_image_webp_url, url)
+        exists.assert_not_called()
+        # Small sources keep the crop but are never upscaled
+        self.assertEqual(images.fit_size((400, 200), images.VARIANTS['detail']), (356, 200))
+
+
+class StaticFilesTests(TestCase):
+    """collectstatic writes hashed, precompressed files served as immutable"""
+
+    def test_hashed_compressed_assets_are_served_immutable(self):
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root, ignore_errors=True)
+        with override_settings(STATIC_ROOT=static_root, EVENTS_TAILWIND_BUILD=False):
+            call_command('collectstatic', interactive=False, verbosity=0, ignore_patterns=['admin'])
+            with open(f'{static_root}/staticfiles.json') as fh:
+                hashed = json.load(fh)['paths']['css/styles.css']
+            self.assertNotEqual(hashed, 'css/styles.css')
+
+            response = self.client.get(f'/static/{hashed}', headers={'accept-encoding': 'gzip, br'})
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertContains(self.client.get(reverse('event_list')), hashed)
+
+    def test_tailwind_build_is_what_gets_hashed(self):
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root, ignore_errors=True)
+
+        def fake_build(output):
+            output.write_text('/*PURGED*/')
+            return True
+
+        with override_settings(STATIC_ROOT=static_root), \
+                mock.patch('events.storage.build_tailwind', side_effect=fake_build):
+            call_command('collectstatic', interactive=False, verbosity=0, ignore_patterns=['admin'])
+        with open(f'{static_root}/staticfiles.json') as fh:
+            hashed = json.load(fh)['paths']['css/styles.css']
+        for name in (hashed, 'css/styles.css'):
+            with open(f'{static_root}/{name}') as fh:
+                self.assertEqual(fh.read(), '/*PURGED*/')
+
+
+@override_settings(EVENTS_TIMING_SAMPLE_RATE=1.0)
+class QueryTimingTests(TestCase):
+    """Measured requests get a Server-Timing header and a JSON log line"""
+
+    def test_measured_request_is_logged(self):
+        with self.assertLogs('events.timing', 'INFO') as logs:
+            response = self.client.get(reverse('category_list'))
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"')
+        [record] = logs.records
+        self.assertEqual(record.levelno, logging.INFO)
+        self.assertEqual((record.timing['view'], record.timing['status']), ('category_list', 200))
+        self.assertEqual(json.loads(record.getMessage()), record.timing)
+
+    @override_settings(EVENTS_SLOW_REQUEST_MS=0)
+    def test_slow_request_logs_a_warning(self):
+        with self.assertLogs('events.timing', 'INFO') as logs:
+            self.client.get(reverse('category_list'))
+        self.assertEqual([record.levelno for record in logs.records], [logging.WARNING])
+
+    @override_settings(EVENTS_TIMING_SAMPLE_RATE=0.5)
+    def test_unsampled_requests_are_not_measured(self):
+        with mock.patch('events.middleware.random.random', return_value=0.7), self.assertNoLogs('events.timing'):
+            self.assertNotIn('Server-Timing', self.client.get(reverse('category_list')))
+        with mock.patch('events.middleware.random.random', return_value=0.3), self.assertLogs('events.timing'):
+            self.assertIn('Server-Timing', self.client.get(reverse('category_list')))
+
+
+class CommandTests(TestCase):
+    """Management commands, run through call_command"""
+
+    def test_seed_data_is_reproducible_and_counted(self):
+        def seed():
+            call_command('seed_data', users=6, events=4, categories=2, rsvps_per_event=3, seed=7, stdout=StringIO())
+            return list(User.objects.order_by('id').values_list('username', flat=True))
+
+        usernames = seed()
+        self.assertEqual((len(usernames), Event.objects.count(), Category.objects.count()), (6, 4, 2))
+        self.assertEqual(Event.participants.through.objects.count(), 12)
+        self.assertFalse(
+            Event.objects.annotate(actual=Count('participants')).exclude(participant_count=F('actual')).exists()
+        )
+        with self.assertRaisesMessage(CommandError, 'already exist'):
+            seed()
+
+        User.objects.all().delete()
+        self.assertEqual(seed(), usernames)
+
+    def test_benchmark_views_reports_json(self):
+        # The command normally seeds its own throwaway database; reuse the test one
+        creation = connection.creation
+        with mock.patch.object(creation, 'create_test_db'), mock.patch.object(creation, 'destroy_test_db'), \
+                mock.patch('events.management.commands.benchmark_views.setup_test_environment'), \
+                mock.patch('events.management.commands.benchmark_views.teardown_test_environment'):
+            out = StringIO()
+            call_command(
+                'benchmark_views', users=5, events=3, categories=1, rsvps_per_event=2, iterations=2, warmup=0,
+                views=['event_list', 'rsvp_event'], stdout=out, stderr=StringIO(),
+            )
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report), {'meta', 'views'})
+        self.assertEqual(report['meta']['dataset'], {'users': 5, 'events': 3, 'categories': 1, 'rsvps_per_event': 2, 'seed': 42})
+        self.assertEqual(report['meta']['iterations'], 2)
+        self.assertEqual(set(report['views']), {'event_list', 'rsvp_event'})
+        for result in report['views'].values():
+            self.assertEqual(set(result), {
+                'status', 'queries', 'min_ms', 'mean_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms', 'peak_memory_kb',
+            })
+            self.assertLessEqual(result['min_ms'], result['p50_ms'])
+            self.assertLessEqual(result['p50_ms'], result['max_ms'])
+        self.assertEqual(report['views']['event_list']['status'], 200)
+
+    def test_benchmark_views_needs_an_iteration(self):
+        with self.assertRaisesMessage(CommandError, '--iterations must be at least 1.'):
+            call_command('benchmark_views', iterations=0)
+
+    def test_explain_queries_prints_plans(self):
+        with self.assertRaisesMessage(CommandError, 'No user to request the pages as'):
+            call_command('explain_queries', stdout=StringIO())
+
+        User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        category = Category.objects.create(name='Music', description='-')
+        Event.objects.create(name='Gig', description='-', date=timezone.localdate(), time='18:00', location='Dhaka', category=category)
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        output = out.getvalue()
+
+        self.assertRegex(output, r'event_list \(keyset\)  GET /\?cursor=[\w-]+  -> 200')
+        self.assertNotIn('-> 404', output)
+        # SQLite's EXPLAIN lists each step of the plan, e.g. "SCAN" or "SEARCH ... USING INDEX"
+        self.assertRegex(output, r'\n    .*(SCAN|SEARCH) ')
+        self.assertNotIn('django_session', output)
+
+    def test_import_events_dry_run_and_rejected_rows(self):
+        def run(*args, **options):
+            out, err = StringIO(), StringIO()
+            call_command('import_events', '-', '--format=csv', *args, stdin=StringIO(ImportTests.CSV), stdout=out, stderr=err, **options)
+            return out.getvalue(), err.getvalue()
+
+        out, err = run('--dry-run')
+        self.assertIn('Would import 3 event(s), created 2 category(ies), rejected 2 row(s)', out)
+        self.assertEqual([line.split(':')[0] for line in err.splitlines()], ['line 4', 'line 5'])
+        self.assertFalse(Event.objects.exists())
+        self.assertFalse(Category.objects.exists())
+
+        out, err = run(max_errors=1)
+        self.assertIn('Imported 3 event(s), created 2 category(ies), rejected 2 row(s)', out)
+        first, more = err.splitlines()
+        self.assertTrue(first.startswith('line 4: date:'))
+        self.assertEqual(more, '... and 1 more rejected row(s)')
+        self.assertEqual(Event.objects.count(), 3)
+
+        with self.assertRaisesMessage(CommandError, 'pass --format'):
+            call_command('import_events', 'events.txt')
+
+    def test_assign_roles_changes_groups(self):
+        organizer, _ = Group.objects.get_or_create(name='Organizer')
+        participant, _ = Group.objects.get_or_create(name='Participant')
+        alice = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        bob = User.objects.create_user('bob', 'bob@example.com', 'pw')
+        bob.groups.add(participant)
+
+        out, err = StringIO(), StringIO()
+        call_command(
+            'assign_roles', 'Organizer', '--users', 'alice', 'nobody', '--file', '-',
+            stdin=StringIO('bob@example.com\n'), stdout=out, stderr=err,
+        )
+        self.assertIn('2 user(s): 2 membership(s) added, 0 removed', out.getvalue())
+        self.assertEqual(err.getvalue().strip(), "No user matches 'nobody'")
+        self.assertEqual(set(bob.groups.values_list('name', flat=True)), {'Organizer', 'Participant'})
+
+        out = StringIO()
+        call_command('assign_roles', 'Organizer', '--users', 'bob', '--mode', 'replace', stdout=out)
+        self.assertIn('1 user(s): 0 membership(s) added, 1 removed', out.getvalue())
+        self.assertEqual(list(bob.groups.all()), [organizer])
+        self.assertEqual(list(alice.groups.all()), [organizer])
+
+        with self.assertRaisesMessage(CommandError, 'Unknown group(s): Speaker'):
+            call_command('assign_roles', 'Organizer', 'Speaker', '--users', 'alice')
+        self.assertEqual(list(alice.groups.all()), [organizer])
+        with self.assertRaisesMessage(CommandError, 'Pass --users and/or --file.'):
+            call_command('assign_roles', 'Organizer')
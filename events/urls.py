@@ -8,8 +8,12 @@ urlpatterns = [
     path('organizer-dashboard/', views.organizer_dashboard, name='organizer_dashboard'),
 
     path('events/add/', views.EventCreateView.as_view(), name='event_create'),
+    path('events/export/', views.event_export, name='event_export'),
+    path('events/import/', views.event_import, name='event_import'),
     path('events/<int:id>/', views.event_detail, name='event_detail'),
+    path('events/<int:id>/attendees/export/', views.event_attendees_export, name='event_attendees_export'),
     path('events/<int:event_id>/rsvp/', views.rsvp_event, name='rsvp_event'),
+    path('api/rsvp/', views.rsvp_api, name='rsvp_api'),
     path('events/edit/<int:id>/', views.EventUpdateView.as_view(), name='event_update'),
     path('events/delete/<int:id>/', views.EventDeleteView.as_view(), name='event_delete'),
 
@@ -22,8 +26,10 @@ urlpatterns = [
     
     path('users/', views.user_list, name='user_list'),
     path('users/<int:user_id>/update-role/', views.user_update_role, name='user_update_role'),
+    path('users/roles/', views.user_bulk_roles, name='user_bulk_roles'),
     path('groups/', views.group_list, name='group_list'),
     path('groups/create/', views.group_create, name='group_create'),
+    path('groups/<int:group_id>/members/', views.group_members, name='group_members'),
     path('groups/<int:group_id>/delete/', views.group_delete, name='group_delete'),
     
     path('profile/', views.ProfileView.as_view(), name='profile'),
@@ -1,87 +1,116 @@
+import codecs
+import json
+
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Count, Q
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.timezone import now
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import Group, User
 from django.contrib.auth.views import LoginView, LogoutView, PasswordChangeView, PasswordResetView, PasswordResetConfirmView
 from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.utils.http import urlencode, urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.urls import reverse
 from django.contrib import messages
-from django.core.mail import send_mail
 from django.conf import settings
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView, DetailView
+from django.views.decorators.http import condition, require_POST
 from django.utils.decorators import method_decorator
 from django.urls import reverse_lazy
+from . import catalog, exports, imports, roles, rsvp
+from .pagination import KeysetPaginator, InvalidCursor
+from .search import get_search_backend, search_terms
+from .stats import dashboard_stats, cached_admin_stats, cached_organizer_stats
 from .models import Event, Category, UserProfile
-from .forms import EventForm, CategoryForm, SignupForm, LoginForm, UserProfileForm, CustomPasswordChangeForm, CustomPasswordResetForm, CustomSetPasswordForm
-
-
-def _in_group(user, group_name: str) -> bool:
-    return user.is_authenticated and user.groups.filter(name=group_name).exists()
+from .forms import EventForm, EventImportForm, BulkRoleForm, CategoryForm, SignupForm, LoginForm, UserProfileForm, CustomPasswordChangeForm, CustomPasswordResetForm, CustomSetPasswordForm
 
 
 def admin_required(view_func):
-    return user_passes_test(lambda u: u.is_superuser or _in_group(u, "Admin"))(view_func)
+    return user_passes_test(roles.is_admin)(view_func)
 
 
 def organizer_required(view_func):
-    def check(user):
-        # Admins are allowed everywhere
-        if user.is_superuser or _in_group(user, "Admin"):
-            return True
-        return _in_group(user, "Organizer")
-
-    return user_passes_test(check)(view_func)
+    return user_passes_test(roles.is_organizer)(view_func)
 
 
 def participant_required(view_func):
-    def check(user):
-        # Admins and Organizers are allowed everywhere
-        if user.is_superuser or _in_group(user, "Admin") or _in_group(user, "Organizer"):
-            return True
-        return _in_group(user, "Participant")
+    return user_passes_test(roles.is_participant)(view_func)
+
+EVENT_LIST_FILTERS = ('search', 'category', 'start', 'end')
 
-    return user_passes_test(check)(view_func)
 
+# Conditional GETs are answered from the catalog version before the page cache;
+# anonymous visitors then share one cached page per filter combination
+@method_decorator(condition(etag_func=catalog.list_etag, last_modified_func=catalog.list_last_modified), name='dispatch')
+@method_decorator(catalog.cache_anonymous_page(*EVENT_LIST_FILTERS, 'page', 'cursor'), name='dispatch')
 class EventListView(ListView):
     """Class-based view for displaying list of events with filtering"""
     model = Event
     template_name = 'events/event_list.html'
     context_object_name = 'events'
     paginate_by = 20
+    ordering = ('date', 'time', 'id')
 
     def get_queryset(self):
-        events = Event.objects.select_related('category').prefetch_related('participants')
+        events = (
+            Event.objects.select_related('category')
+            .with_attendance(self.request.user)
+        )
         
         start = self.request.GET.get('start')
         end = self.request.GET.get('end')
         category_id = self.request.GET.get('category')
         search = self.request.GET.get('search')
         
-        # Search filter
-        if search:
-            events = events.filter(
-                Q(name__icontains=search) | Q(location__icontains=search)
-            )
-        
         if start and end:
             events = events.filter(date__range=[start, end])
         
         if category_id:
             events = events.filter(category_id=category_id)
+
+        # Full-text search on name, location, description and category; a query
+        # without any words (e.g. "!") is no search at all
+        if search_terms(search):
+            events = get_search_backend().filter(events, search)
+            # Keyset pages must follow the (date, time, id) ordering
+            if not self.uses_keyset_pagination():
+                return events.order_by('-search_rank', *self.get_ordering())
         
-        return events
+        return events.order_by(*self.get_ordering())
+
+    def uses_keyset_pagination(self):
+        """A non-empty ``cursor`` parameter, or EVENTS_LIST_PAGINATION = 'keyset', selects keyset mode"""
+        # An empty cursor must not switch modes: the page cache key drops empty values
+        return bool(self.request.GET.get('cursor')) or getattr(settings, 'EVENTS_LIST_PAGINATION', 'offset') == 'keyset'
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        # No COUNT(*) and no OFFSET: seek past the last (date, time, id) seen
+        paginator = KeysetPaginator(queryset, self.get_ordering(), page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor') or None)
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        return (paginator, page, page.object_list, page.has_other_pages())
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Echo only the normalized filters, exactly what the page cache is keyed on
+        filters = catalog.normalized_params(self.request, EVENT_LIST_FILTERS)
+        selected = dict(filters)
+        context['filter_query'] = urlencode(filters)
+        context['keyset_pagination'] = self.uses_keyset_pagination()
+        context['catalog_content_version'] = catalog.content_version()
+        context['catalog_cache_timeout'] = catalog.timeout()
         context['categories'] = Category.objects.all()
-        context['search'] = self.request.GET.get('search', '')
-        context['selected_category'] = self.request.GET.get('category', '')
-        context['start_date'] = self.request.GET.get('start', '')
-        context['end_date'] = self.request.GET.get('end', '')
+        context['search'] = selected.get('search', '')
+        context['selected_category'] = selected.get('category', '')
+        context['start_date'] = selected.get('start', '')
+        context['end_date'] = selected.get('end', '')
         return context
 
 @login_required
@@ -89,15 +118,13 @@ class EventListView(ListView):
 def dashboard(request):
     today = now().date()
 
-    stats = {
-        "total_events": Event.objects.count(),
-        "upcoming_events": Event.objects.filter(date__gt=today).count(),
-        "past_events": Event.objects.filter(date__lt=today).count(),
-        "total_users": User.objects.count(),
-    }
+    stats = dashboard_stats(today)
 
     filter_type = request.GET.get('filter', 'rsvp')
-    events = Event.objects.select_related('category').prefetch_related('participants')
+    events = (
+        Event.objects.select_related('category')
+        .with_attendance(request.user)
+    )
     
     if filter_type == 'upcoming':
         events = events.filter(date__gt=today).order_by('date', 'time')
@@ -121,14 +148,56 @@ def dashboard(request):
         'today': today,
     })
    
+USER_LIST_PAGE_SIZE = 50
+
+
 @login_required
 @admin_required
 def user_list(request):
-    users = User.objects.all().prefetch_related('groups')
+    """Keyset-paginated users, filterable by group, active flag and username/email prefix"""
+    rsvps = (
+        Event.participants.through.objects.filter(user_id=OuterRef('pk'))
+        .order_by().values('user_id').annotate(total=Count('*')).values('total')
+    )
+    users = (
+        User.objects.only('id', 'username', 'email', 'is_active', 'date_joined')
+        .annotate(rsvp_count=Coalesce(Subquery(rsvps), 0))
+        # Prefetching applies to the fetched page only
+        .prefetch_related('groups')
+    )
+
+    group_id = request.GET.get('group', '')
+    active = request.GET.get('active', '')
+    query = request.GET.get('q', '').strip()
+    if group_id.isdigit():
+        # EXISTS lets the planner walk the id index instead of sorting the whole group
+        members = User.groups.through.objects.filter(user_id=OuterRef('pk'), group_id=group_id)
+        users = users.filter(Exists(members))
+    if active in ('1', '0'):
+        users = users.filter(is_active=active == '1')
+    if query:
+        users = users.filter(Q(username__istartswith=query) | Q(email__istartswith=query))
+
+    # Newest accounts first; no COUNT(*) or OFFSET over the whole user table
+    paginator = KeysetPaginator(users, ('-id',), USER_LIST_PAGE_SIZE)
+    try:
+        page = paginator.page(request.GET.get('cursor') or None)
+    except InvalidCursor:
+        raise Http404("Invalid cursor")
+
+    filters = request.GET.copy()
+    filters.pop('cursor', None)
     return render(request, 'events/user_list.html', {
-        'users': users
+        'users': page.object_list,
+        'page_obj': page,
+        'groups': Group.objects.order_by('name'),
+        'filter_query': filters.urlencode(),
+        'selected_group': group_id,
+        'selected_active': active,
+        'search': query,
     })
- 
+
+
 @method_decorator(login_required, name='dispatch')
 @method_decorator(organizer_required, name='dispatch')
 class EventCreateView(CreateView):
@@ -166,9 +235,50 @@ class EventDeleteView(DeleteView):
     success_url = reverse_lazy('event_list')
     pk_url_kwarg = 'id'
 
+ATTENDEES_PAGE_SIZE = 50
+
+
+def _event_version(request, id):
+    """``(updated_at, participant_count)`` of event ``id``, looked up once per request"""
+    if not hasattr(request, '_event_version'):
+        request._event_version = Event.objects.filter(pk=id).values_list('updated_at', 'participant_count').first()
+    return request._event_version
+
+
+def event_detail_etag(request, id):
+    version = _event_version(request, id)
+    if version is None or len(messages.get_messages(request)):
+        return None
+    return catalog.make_etag(version, catalog.viewer_state(request))
+
+
+def event_detail_last_modified(request, id):
+    version = _event_version(request, id)
+    if version is None or request.user.is_authenticated or len(messages.get_messages(request)):
+        return None
+    return version[0]
+
+
+# One indexed lookup answers If-None-Match / If-Modified-Since with a 304
+@condition(etag_func=event_detail_etag, last_modified_func=event_detail_last_modified)
 def event_detail(request, id):
-    event = get_object_or_404(Event, id=id)
-    return render(request, "events/event_detail.html", {"event": event})
+    event = get_object_or_404(
+        Event.objects.select_related('category').with_attendance(request.user), id=id,
+    )
+    # One page of attendees, with just the columns the list shows
+    attendees = event.participants.only('id', 'username', 'first_name', 'last_name')
+    paginator = KeysetPaginator(attendees, ('id',), ATTENDEES_PAGE_SIZE)
+    try:
+        attendee_page = paginator.page(request.GET.get('cursor') or None)
+    except InvalidCursor:
+        raise Http404("Invalid cursor")
+    return render(request, "events/event_detail.html", {
+        "event": event,
+        "attendees": attendee_page.object_list,
+        "attendee_page": attendee_page,
+        "can_rsvp": roles.in_group(request.user, roles.PARTICIPANT),
+        "can_manage": roles.is_organizer(request.user),
+    })
 
 @login_required
 @participant_required
@@ -179,60 +289,131 @@ def rsvp_event(request, event_id):
         action = request.POST.get('action')
         
         if action == 'rsvp':
-            if request.user in event.participants.all():
-                messages.warning(request, "You have already RSVP'd to this event.")
-            else:
-                event.participants.add(request.user)
-                
-                # Send RSVP confirmation email
-                try:
-                    send_mail(
-                        subject=f'RSVP Confirmation: {event.name}',
-                        message=f'Hi {request.user.get_full_name() or request.user.username},\n\n'
-                               f'You have successfully RSVP\'d to the following event:\n\n'
-                               f'Event: {event.name}\n'
-                               f'Date: {event.date}\n'
-                               f'Time: {event.time}\n'
-                               f'Location: {event.location}\n\n'
-                               f'Thank you for your interest!\n\n'
-                               f'Best regards,\nEvent Management Team',
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[request.user.email],
-                        fail_silently=False,
-                    )
-                except Exception as e:
-                    print(f"RSVP email sending failed: {e}") 
-                
+            result = rsvp.rsvp(event, request.user)
+            if result.status == rsvp.ATTENDING:
                 messages.success(request, f"You have successfully RSVP'd to {event.name}!")
+            elif result.status == rsvp.FULL:
+                messages.warning(request, f"Sorry, {event.name} is full.")
+            else:
+                messages.warning(request, "You have already RSVP'd to this event.")
         
         elif action == 'cancel_rsvp':
-            if request.user in event.participants.all():
-                event.participants.remove(request.user)
-                
-                # Send cancellation confirmation email
-                try:
-                    send_mail(
-                        subject=f'RSVP Cancellation: {event.name}',
-                        message=f'Hi {request.user.get_full_name() or request.user.username},\n\n'
-                               f'Your RSVP for the following event has been cancelled:\n\n'
-                               f'Event: {event.name}\n'
-                               f'Date: {event.date}\n'
-                               f'Time: {event.time}\n'
-                               f'Location: {event.location}\n\n'
-                               f'If this was a mistake, you can RSVP again.\n\n'
-                               f'Best regards,\nEvent Management Team',
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[request.user.email],
-                        fail_silently=False,
-                    )
-                except Exception as e:
-                    print(f"Cancellation email sending failed: {e}")  # Debug output
-                
+            if rsvp.cancel(event, request.user).changed:
                 messages.success(request, f"You have cancelled your RSVP for {event.name}.")
             else:
                 messages.warning(request, "You are not RSVP'd to this event.")
         
         return redirect('event_detail', id=event_id)
+
+
+RSVP_API_ACTIONS = {'rsvp': rsvp.rsvp, 'cancel_rsvp': rsvp.cancel}
+
+
+def _rsvp_operations(request):
+    """Parse ``{"action", "event"}`` or ``{"operations": [...]}`` from a JSON body"""
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Request body must be JSON.')
+    operations = payload.get('operations', [payload]) if isinstance(payload, dict) else None
+    if not isinstance(operations, list) or not operations:
+        raise ValueError('Expected an operation or a non-empty "operations" list.')
+    limit = getattr(settings, 'EVENTS_RSVP_BATCH_LIMIT', 100)
+    if len(operations) > limit:
+        raise ValueError(f'At most {limit} operations per request.')
+    parsed = []
+    for operation in operations:
+        if not isinstance(operation, dict) or operation.get('action') not in RSVP_API_ACTIONS:
+            raise ValueError('Each operation needs an "action" of "rsvp" or "cancel_rsvp".')
+        event_id = operation.get('event')
+        if not isinstance(event_id, int) or isinstance(event_id, bool):
+            raise ValueError('Each operation needs an integer "event" id.')
+        parsed.append((operation['action'], event_id))
+    return parsed
+
+
+@require_POST
+def rsvp_api(request):
+    """JSON RSVP/cancel for the current user, one operation or a batch.
+
+    Same access rules as ``rsvp_event``, but answers with JSON errors instead
+    of redirects. Each result carries the event's new participant count so
+    the page can update in place.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    if not roles.is_participant(request.user):
+        return JsonResponse({'error': 'Only participants can RSVP.'}, status=403)
+    try:
+        operations = _rsvp_operations(request)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    events = Event.objects.only('name', 'date', 'time', 'location').in_bulk({pk for _, pk in operations})
+    results = []
+    for action, event_id in operations:
+        event = events.get(event_id)
+        if event is None:
+            results.append({'event': event_id, 'status': 'not_found'})
+            continue
+        result = RSVP_API_ACTIONS[action](event, request.user)
+        results.append({'event': event_id, 'status': result.status, 'attending': result.attending})
+
+    counts = dict(Event.objects.filter(pk__in=events).values_list('pk', 'participant_count'))
+    for item in results:
+        if item['event'] in counts:
+            item['participant_count'] = counts[item['event']]
+    return JsonResponse({'results': results})
+
+
+def _export_response(request, lines_for, filename):
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in exports.FORMATS:
+        raise Http404('Unknown export format')
+    response = StreamingHttpResponse(lines_for(fmt), content_type=exports.CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
+
+
+@login_required
+@organizer_required
+def event_export(request):
+    """Stream all events as ``?format=csv`` (default) or ``jsonl``"""
+    return _export_response(request, lambda fmt: exports.export_events(fmt), 'events')
+
+
+@login_required
+@organizer_required
+def event_attendees_export(request, id):
+    """Stream the attendee list of one event without loading it into memory"""
+    event = get_object_or_404(Event.objects.only('id'), id=id)
+    return _export_response(
+        request, lambda fmt: exports.export_attendees(event.pk, fmt), f'event-{event.pk}-attendees',
+    )
+
+
+@login_required
+@organizer_required
+def event_import(request):
+    """Bulk import events from an uploaded CSV or JSON Lines file"""
+    form = EventImportForm(request.POST or None, request.FILES or None)
+    result = None
+    if form.is_valid():
+        # Decode line by line so large uploads are never read into memory whole
+        lines = codecs.iterdecode(form.cleaned_data['file'], 'utf-8-sig')
+        result = imports.import_events(lines, form.cleaned_data['format'], dry_run=form.cleaned_data['dry_run'])
+        if form.cleaned_data['dry_run']:
+            messages.info(request, f'{result.created} row(s) are valid and {result.failed} would be rejected.')
+        elif result.created:
+            messages.success(request, f'Imported {result.created} event(s).')
+    return render(request, 'events/event_import.html', {
+        'form': form,
+        'result': result,
+        'errors': result.errors[:100] if result else [],
+    })
+
+
+@method_decorator(catalog.cache_anonymous_page(), name='dispatch')
 class CategoryListView(ListView):
     """Class-based view for displaying list of categories"""
     model = Category
@@ -390,18 +571,7 @@ def admin_dashboard(request):
     today = now().date()
     
     # Comprehensive stats for admins
-    stats = {
-        "total_events": Event.objects.count(),
-        "upcoming_events": Event.objects.filter(date__gt=today).count(),
-        "past_events": Event.objects.filter(date__lt=today).count(),
-        "total_users": User.objects.count(),
-        "active_users": User.objects.filter(is_active=True).count(),
-        "inactive_users": User.objects.filter(is_active=False).count(),
-        "total_participants": User.objects.filter(groups__name="Participant").count(),
-        "total_organizers": User.objects.filter(groups__name="Organizer").count(),
-        "total_admins": User.objects.filter(groups__name="Admin").count(),
-        "total_categories": Category.objects.count(),
-    }
+    stats = cached_admin_stats(today)
 
     # Recent events and users for admin overview
     recent_events = Event.objects.select_related('category').order_by('-date')[:5]
@@ -422,20 +592,10 @@ def organizer_dashboard(request):
     today = now().date()
     
     # Events for organizer to manage
-    my_events = Event.objects.select_related('category').prefetch_related('participants').order_by('date')
-    
-    # Calculate total RSVPs across all events
-    total_rsvps = sum(event.participants.count() for event in my_events)
+    my_events = Event.objects.select_related('category').order_by('date')
     
     # Stats relevant to organizers
-    stats = {
-        "my_events_count": my_events.count(),
-        "upcoming_events": Event.objects.filter(date__gt=today).count(),
-        "past_events": Event.objects.filter(date__lt=today).count(),
-        "total_categories": Category.objects.count(),
-        "total_participants": User.objects.filter(groups__name="Participant").count(),
-        "total_rsvps": total_rsvps,
-    }
+    stats = cached_organizer_stats(today)
 
     return render(request, "events/organizer_dashboard.html", {
         **stats,
@@ -449,14 +609,15 @@ def organizer_dashboard(request):
 def user_update_role(request, user_id):
     user = get_object_or_404(User, id=user_id)
     if request.method == 'POST':
-        # Clear existing groups
-        user.groups.clear()
-        
-        # Add selected groups
-        group_names = request.POST.getlist('groups')
-        for group_name in group_names:
-            group, _ = Group.objects.get_or_create(name=group_name)
-            user.groups.add(group)
+        try:
+            roles.change_roles([user.pk], request.POST.getlist('groups'), roles.REPLACE)
+        except ValueError as exc:
+            messages.error(request, str(exc))
+            return redirect('user_update_role', user_id=user.pk)
+
+        # The admin may have edited their own roles
+        if user.pk == request.user.pk:
+            roles.invalidate_group_names(request.user)
         
         return redirect('user_list')
     
@@ -471,6 +632,27 @@ def user_update_role(request, user_id):
     })
 
 
+@login_required
+@admin_required
+def user_bulk_roles(request):
+    """Grant, revoke or replace groups for many users in one request"""
+    form = BulkRoleForm(request.POST or None)
+    if form.is_valid():
+        user_ids, unmatched = roles.find_user_ids(form.cleaned_data['users'])
+        change = roles.change_roles(user_ids, form.cleaned_data['groups'], form.cleaned_data['mode'])
+        if request.user.pk in user_ids:
+            roles.invalidate_group_names(request.user)
+        messages.success(
+            request,
+            f'Updated {change.users} user(s): {change.added} membership(s) added, {change.removed} removed.',
+        )
+        if unmatched:
+            shown = ', '.join(sorted(unmatched)[:20])
+            messages.warning(request, f'{len(unmatched)} name(s) matched no user: {shown}')
+        return redirect('user_bulk_roles')
+    return render(request, 'events/user_bulk_roles.html', {'form': form})
+
+
 @login_required
 @admin_required
 def group_create(request):
@@ -486,9 +668,32 @@ def group_create(request):
 @login_required
 @admin_required
 def group_list(request):
-    groups = Group.objects.all().prefetch_related('user_set')
+    # Member counts are aggregated in SQL; members are loaded per group on demand
+    groups = Group.objects.annotate(member_count=Count('user')).order_by('name')
     return render(request, 'events/group_list.html', {
-        'groups': groups
+        'groups': groups,
+        'system_groups': roles.SYSTEM_GROUPS,
+    })
+
+
+GROUP_MEMBERS_PAGE_SIZE = 50
+
+
+@login_required
+@admin_required
+def group_members(request, group_id):
+    """One keyset-paginated page of a group's members"""
+    group = get_object_or_404(Group, id=group_id)
+    members = User.objects.filter(groups=group).only('id', 'username', 'email', 'first_name', 'last_name', 'is_active')
+    paginator = KeysetPaginator(members, ('id',), GROUP_MEMBERS_PAGE_SIZE)
+    try:
+        page = paginator.page(request.GET.get('cursor') or None)
+    except InvalidCursor:
+        raise Http404("Invalid cursor")
+    return render(request, 'events/group_members.html', {
+        'group': group,
+        'members': page.object_list,
+        'page_obj': page,
     })
 
 
@@ -508,10 +713,10 @@ def group_delete(request, group_id):
 def login_redirect(request):
     user = request.user
 
-    if user.is_superuser or user.groups.filter(name="Admin").exists():
+    if roles.is_admin(user):
         return redirect('admin_dashboard')
 
-    if user.groups.filter(name="Organizer").exists():
+    if roles.in_group(user, roles.ORGANIZER):
         return redirect('organizer_dashboard')
 
     return redirect('dashboard')  # Participant default
@@ -3,6 +3,7 @@ module.exports = {
   content: [
     "./templates/**/*.html", // Templates at the project level
     "./**/templates/**/*.html", // Templates inside apps
+    "./events/**/*.py", // Widget classes set in forms
   ],
   theme: {
     extend: {},